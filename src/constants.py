@@ -15,7 +15,9 @@ APP_ISSUE_URL = "https://github.com/processmanager/processmanager/issues"
 # Default refresh interval in milliseconds
 DEFAULT_REFRESH_INTERVAL = 2000
 
-# CSS styles for the application
+# CSS styles for the application (fallback when style.css is not found).
+# Loaded into one application-wide provider by ProcessManagerApplication;
+# dialogs and widgets must not add their own providers for these classes.
 APP_CSS = """
 .high-usage-panel {
     background-color: alpha(@warning_color, 0.1);
@@ -79,3 +81,10 @@ APP_CSS = """
 }
 """
 
+try:
+    from gi.repository import GLib
+except ImportError:  # Keep constants importable without PyGObject
+    APP_CSS_BYTES = None
+else:
+    # Pre-encoded once so the CSS fallback doesn't re-encode APP_CSS per load
+    APP_CSS_BYTES = GLib.Bytes.new(APP_CSS.encode('utf-8'))
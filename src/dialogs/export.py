@@ -5,7 +5,55 @@ import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 
-from gi.repository import Gtk, Adw
+import csv
+import json
+import threading
+from itertools import compress
+from gi.repository import Gtk, Adw, GLib
+
+
+# Export column names mapped to process dict keys, in display order
+_COL_MAP = {
+    "Process Name": "name",
+    "CPU %": "cpu",
+    "Memory": "memory",
+    "Started": "started",
+    "User": "user",
+    "Nice": "nice",
+    "PID": "pid",
+}
+_COLUMN_NAMES = tuple(_COL_MAP)
+
+# Memory units as (bit_length threshold, suffix, divisor), largest first
+_UNITS = ((30, "GB", 1 << 30), (20, "MB", 1 << 20), (10, "KB", 1 << 10))
+
+
+def _format_memory(mem):
+    """Format a byte count using the largest unit it reaches."""
+    bits = int(mem).bit_length()
+    for threshold, suffix, divisor in _UNITS:
+        if bits > threshold:
+            return f"{mem / divisor:.2f} {suffix}"
+    return f"{mem} B"
+
+
+# Per-key cell formatters for CSV/TXT export; other keys fall back to str()
+_FORMATTERS = {
+    "cpu": lambda proc: f"{proc.get('cpu', 0):.1f}%",
+    "memory": lambda proc: _format_memory(proc.get('memory', 0)),
+}
+
+
+def _build_formatters(columns):
+    """Resolve one cell formatter per selected column, in column order."""
+    formatters = []
+    for col in columns:
+        key = _COL_MAP.get(col, col.lower())
+        formatter = _FORMATTERS.get(key)
+        if formatter is None:
+            formatter = lambda proc, key=key: str(proc.get(key, ""))
+        formatters.append(formatter)
+    return formatters
 
 
 class ExportDialog(Adw.Window):
@@ -18,7 +66,8 @@ class ExportDialog(Adw.Window):
             process_manager: ProcessManager instance
             tree_view: The process tree view
             list_store: The list store
-            selected_pids: Dict of selected PIDs
+            selected_pids: Selected PIDs (dict keyed by PID or any iterable);
+                snapshotted as a frozenset
         """
         super().__init__(
             transient_for=parent,
@@ -32,7 +81,7 @@ class ExportDialog(Adw.Window):
         self.process_manager = process_manager
         self.tree_view = tree_view
         self.list_store = list_store
-        self.selected_pids = selected_pids
+        self.selected_pids = frozenset(selected_pids) if selected_pids else frozenset()
         
         self.build_ui()
     
@@ -91,13 +140,14 @@ class ExportDialog(Adw.Window):
         content_box.append(columns_group)
         
         # Get column names
-        self.column_names = ["Process Name", "CPU %", "Memory", "Started", "User", "Nice", "PID"]
-        self.column_checkboxes = {}
+        # Check buttons are kept index-parallel to column_names
+        self.column_names = _COLUMN_NAMES
+        self.column_checks = []
         
         for col_name in self.column_names:
             check = Gtk.CheckButton(label=col_name)
             check.set_active(True)
-            self.column_checkboxes[col_name] = check
+            self.column_checks.append(check)
             columns_group.add(check)
         
         # Buttons
@@ -121,7 +171,7 @@ class ExportDialog(Adw.Window):
         format_id = self.format_combo.get_active_id()
         
         # Get selected columns
-        selected_columns = [name for name, check in self.column_checkboxes.items() if check.get_active()]
+        selected_columns = list(compress(self.column_names, [check.get_active() for check in self.column_checks]))
         if not selected_columns:
             self.parent.show_error("Please select at least one column")
             return
@@ -131,21 +181,19 @@ class ExportDialog(Adw.Window):
         
         # Get data
         if scope == "selected" and self.selected_pids:
-            processes = []
-            all_processes = self.process_manager.get_processes(show_all=True, my_processes=False, active_only=False, show_kernel_threads=True)
-            for proc in all_processes:
-                if proc['pid'] in self.selected_pids:
-                    processes.append(proc)
+            # Only query the selected PIDs rather than the full process table
+            processes = self.process_manager.get_processes_by_pids(self.selected_pids)
         else:
+            # Single process table fetch, indexed by PID
+            all_processes = self.process_manager.get_processes(show_all=True, my_processes=False, active_only=False, show_kernel_threads=True)
+            by_pid = {proc['pid']: proc for proc in all_processes}
+            
             # Get all visible processes from list store
             processes = []
             for row in self.list_store:
-                pid = row[6]  # PID column
-                all_processes = self.process_manager.get_processes(show_all=True, my_processes=False, active_only=False, show_kernel_threads=True)
-                for proc in all_processes:
-                    if proc['pid'] == pid:
-                        processes.append(proc)
-                        break
+                proc = by_pid.get(row[6])  # PID column
+                if proc is not None:
+                    processes.append(proc)
         
         if not processes:
             self.parent.show_error("No processes to export")
@@ -193,6 +241,16 @@ class ExportDialog(Adw.Window):
         file_path = dialog.get_file().get_path()
         dialog.destroy()
         
+        # Write the file off the GTK main loop so large exports don't stall the UI
+        threading.Thread(
+            target=self._export_worker,
+            args=(file_path, format_id, selected_columns, processes),
+            daemon=True,
+            name="ProcessExporter"
+        ).start()
+    
+    def _export_worker(self, file_path, format_id, selected_columns, processes):
+        """Write the export file (runs in a background thread)."""
         try:
             # Export based on format
             if format_id == "csv":
@@ -201,111 +259,54 @@ class ExportDialog(Adw.Window):
                 self.export_json(file_path, selected_columns, processes)
             else:
                 self.export_txt(file_path, selected_columns, processes)
-            
-            self.parent.show_error(f"Exported {len(processes)} processes to {file_path}")
-            self.close()
         except Exception as e:
-            self.parent.show_error(f"Export failed: {e}")
+            GLib.idle_add(self._on_export_failed, str(e))
+        else:
+            GLib.idle_add(self._on_export_done, len(processes), file_path)
+    
+    def _on_export_done(self, count, file_path):
+        """Report a finished export (called from GLib.idle_add)."""
+        self.parent.show_error(f"Exported {count} processes to {file_path}")
+        self.close()
+        return False
+    
+    def _on_export_failed(self, message):
+        """Report a failed export (called from GLib.idle_add)."""
+        self.parent.show_error(f"Export failed: {message}")
+        return False
     
     def export_csv(self, file_path, columns, processes):
         """Export to CSV format."""
-        import csv
-        
-        # Map column names to process keys
-        col_map = {
-            "Process Name": "name",
-            "CPU %": "cpu",
-            "Memory": "memory",
-            "Started": "started",
-            "User": "user",
-            "Nice": "nice",
-            "PID": "pid"
-        }
+        formatters = _build_formatters(columns)
+        rows = [[fmt(proc) for fmt in formatters] for proc in processes]
         
         with open(file_path, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
             writer.writerow(columns)
-            
-            for proc in processes:
-                row = []
-                for col in columns:
-                    key = col_map.get(col, col.lower())
-                    if key == "cpu":
-                        row.append(f"{proc.get(key, 0):.1f}%")
-                    elif key == "memory":
-                        # Format memory
-                        mem = proc.get(key, 0)
-                        if mem >= 1024**3:
-                            row.append(f"{mem / (1024**3):.2f} GB")
-                        elif mem >= 1024**2:
-                            row.append(f"{mem / (1024**2):.2f} MB")
-                        elif mem >= 1024:
-                            row.append(f"{mem / 1024:.2f} KB")
-                        else:
-                            row.append(f"{mem} B")
-                    else:
-                        row.append(str(proc.get(key, "")))
-                writer.writerow(row)
+            writer.writerows(rows)
     
     def export_json(self, file_path, columns, processes):
         """Export to JSON format."""
-        import json
-        
-        col_map = {
-            "Process Name": "name",
-            "CPU %": "cpu",
-            "Memory": "memory",
-            "Started": "started",
-            "User": "user",
-            "Nice": "nice",
-            "PID": "pid"
-        }
-        
-        data = []
-        for proc in processes:
-            item = {}
-            for col in columns:
-                key = col_map.get(col, col.lower())
-                item[col] = proc.get(key, "")
-            data.append(item)
+        keys = [(col, _COL_MAP.get(col, col.lower())) for col in columns]
         
+        # Stream one object at a time instead of building the whole list;
+        # the output matches json.dump(data, f, indent=2).
         with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
+            f.write("[")
+            separator = "\n  "
+            for proc in processes:
+                item = {col: proc.get(key, "") for col, key in keys}
+                f.write(separator)
+                f.write(json.dumps(item, indent=2).replace("\n", "\n  "))
+                separator = ",\n  "
+            f.write("]" if separator == "\n  " else "\n]")
     
     def export_txt(self, file_path, columns, processes):
         """Export to plain text format."""
-        col_map = {
-            "Process Name": "name",
-            "CPU %": "cpu",
-            "Memory": "memory",
-            "Started": "started",
-            "User": "user",
-            "Nice": "nice",
-            "PID": "pid"
-        }
+        header = "\t".join(columns)
+        lines = [header + "\n", "-" * len(header) + "\n"]
+        formatters = _build_formatters(columns)
+        lines.extend("\t".join([fmt(proc) for fmt in formatters]) + "\n" for proc in processes)
         
         with open(file_path, 'w', encoding='utf-8') as f:
-            # Header
-            f.write("\t".join(columns) + "\n")
-            f.write("-" * (len("\t".join(columns))) + "\n")
-            
-            # Data
-            for proc in processes:
-                row = []
-                for col in columns:
-                    key = col_map.get(col, col.lower())
-                    if key == "cpu":
-                        row.append(f"{proc.get(key, 0):.1f}%")
-                    elif key == "memory":
-                        mem = proc.get(key, 0)
-                        if mem >= 1024**3:
-                            row.append(f"{mem / (1024**3):.2f} GB")
-                        elif mem >= 1024**2:
-                            row.append(f"{mem / (1024**2):.2f} MB")
-                        elif mem >= 1024:
-                            row.append(f"{mem / 1024:.2f} KB")
-                        else:
-                            row.append(f"{mem} B")
-                    else:
-                        row.append(str(proc.get(key, "")))
-                f.write("\t".join(row) + "\n")
+            f.write("".join(lines))
@@ -8,6 +8,20 @@ gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, Pango, Gdk
 
 
+# Longest single-line value handed to a label as-is
+_MAX_LABEL_CHARS = 200
+
+
+def _exceeds_lines(value, max_lines):
+    """Check whether value has more than max_lines lines, scanning only as far as needed."""
+    index = -1
+    for _ in range(max_lines):
+        index = value.find('\n', index + 1)
+        if index < 0:
+            return False
+    return True
+
+
 class ProcessDetailsDialog(Adw.Window):
     """Dialog for displaying detailed process information with copyable fields."""
     
@@ -30,6 +44,7 @@ class ProcessDetailsDialog(Adw.Window):
         self.process_manager = process_manager
         self.pid = pid
         self.process_info = process_info
+        self._clipboard = Gdk.Display.get_default().get_clipboard()
         
         self.build_ui()
     
@@ -58,8 +73,7 @@ class ProcessDetailsDialog(Adw.Window):
         scrolled.set_child(content_box)
         main_box.append(scrolled)
         
-        # Get detailed process info
-        details = self.process_manager.get_process_details(self.pid)
+        self._content_box = content_box
         
         # Basic info group
         basic_group = Adw.PreferencesGroup()
@@ -90,6 +104,22 @@ class ProcessDetailsDialog(Adw.Window):
         # Started
         self.add_copyable_row(basic_group, "Started", self.process_info.get('started', 'N/A'))
         
+        # Close on Escape via GTK's shortcut engine (no Python callback per key press)
+        shortcut_controller = Gtk.ShortcutController()
+        shortcut_controller.add_shortcut(Gtk.Shortcut.new(
+            Gtk.ShortcutTrigger.parse_string("Escape"),
+            Gtk.NamedAction.new("window.close"),
+        ))
+        self.add_controller(shortcut_controller)
+        
+        # Read detailed process info in the background and build the
+        # remaining groups when it arrives
+        self.process_manager.get_process_details_async(self.pid, self._build_secondary)
+    
+    def _build_secondary(self, details):
+        """Build execution, resource and environment groups (called from GLib.idle_add)."""
+        content_box = self._content_box
+        
         # Execution info group
         exec_group = Adw.PreferencesGroup()
         exec_group.set_title("Execution Details")
@@ -115,20 +145,35 @@ class ProcessDetailsDialog(Adw.Window):
         # File descriptors
         self.add_copyable_row(resource_group, "File Descriptors", str(details.get('fd_count', 'N/A')))
         
-        # Environment variables group (if available)
-        environ = details.get('environ', '')
-        if environ and environ != 'N/A':
-            env_group = Adw.PreferencesGroup()
-            env_group.set_title("Environment Variables")
-            content_box.append(env_group)
-            
-            # Show environment in a text view
-            self.add_copyable_row(env_group, "Environment", environ, multiline=True, max_lines=10)
+        # Environment variables group (read from the process on first expand)
+        env_group = Adw.PreferencesGroup()
+        env_group.set_title("Environment Variables")
+        content_box.append(env_group)
+        
+        env_expander = Adw.ExpanderRow()
+        env_expander.set_title("Environment")
+        env_expander.connect("notify::expanded", self.on_environ_expanded)
+        env_group.add(env_expander)
+        self._environ_loaded = False
+        
+        return False  # Don't repeat
+    
+    def on_environ_expanded(self, expander, pspec):
+        """Load and show the environment variables the first time they are expanded."""
+        if self._environ_loaded or not expander.get_expanded():
+            return
+        self._environ_loaded = True
         
-        # Add key controller for keyboard shortcuts
-        key_controller = Gtk.EventControllerKey()
-        key_controller.connect("key-pressed", self.on_key_pressed)
-        self.add_controller(key_controller)
+        # Reading the environment can take a host round trip; do it in the
+        # background like the other details
+        self.process_manager.get_environ_async(
+            self.pid, lambda environ: self._show_environ(expander, environ)
+        )
+    
+    def _show_environ(self, expander, environ):
+        """Show the environment variables (called from GLib.idle_add)."""
+        self.add_copyable_row(expander, "Variables", environ, multiline=True, max_lines=10)
+        return False  # Don't repeat
     
     def add_copyable_row(self, group, label, value, multiline=False, max_lines=3):
         """Add a row with a copyable value field."""
@@ -136,26 +181,21 @@ class ProcessDetailsDialog(Adw.Window):
         row.set_title(label)
         
         if multiline:
-            # For multiline content, use a text view with copy button
+            # For multiline content, use a wrapping label or text view with copy button
             multiline_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
             multiline_box.set_hexpand(True)
             
-            # Text view for multiline content
-            text_view = Gtk.TextView()
-            text_view.set_editable(False)
-            text_view.set_wrap_mode(Gtk.WrapMode.WORD_CHAR)
-            text_view.get_buffer().set_text(value)
-            text_view.set_monospace(True)
-            text_view.add_css_class("card")
-            text_view.set_cursor_visible(False)
-            
-            # Calculate height based on content
-            lines = value.count('\n') + 1
-            display_lines = min(lines, max_lines)
-            text_view.set_size_request(-1, display_lines * 20 + 12)
-            
-            # Wrap in scrolled window if content exceeds max_lines
-            if lines > max_lines:
+            if _exceeds_lines(value, max_lines):
+                # Long content: text view in a scrolled window capped at max_lines
+                text_view = Gtk.TextView()
+                text_view.set_editable(False)
+                text_view.set_wrap_mode(Gtk.WrapMode.WORD_CHAR)
+                text_view.get_buffer().set_text(value)
+                text_view.set_monospace(True)
+                text_view.add_css_class("card")
+                text_view.set_cursor_visible(False)
+                text_view.set_size_request(-1, max_lines * 20 + 12)
+                
                 scroll = Gtk.ScrolledWindow()
                 scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
                 scroll.set_max_content_height(max_lines * 20 + 12)
@@ -163,8 +203,15 @@ class ProcessDetailsDialog(Adw.Window):
                 scroll.set_hexpand(True)
                 multiline_box.append(scroll)
             else:
-                text_view.set_hexpand(True)
-                multiline_box.append(text_view)
+                # Short content: a selectable wrapping label is much lighter than a text view
+                value_label = Gtk.Label(label=value)
+                value_label.set_selectable(True)
+                value_label.set_wrap(True)
+                value_label.set_wrap_mode(Pango.WrapMode.WORD_CHAR)
+                value_label.set_xalign(0)
+                value_label.set_css_classes(["monospace", "card"])
+                value_label.set_hexpand(True)
+                multiline_box.append(value_label)
             
             # Copy button for multiline content
             copy_btn = Gtk.Button()
@@ -174,7 +221,7 @@ class ProcessDetailsDialog(Adw.Window):
             copy_btn.add_css_class("circular")
             copy_btn.set_valign(Gtk.Align.START)
             copy_btn.set_margin_top(4)
-            copy_btn.connect("clicked", lambda b, v=value: self.copy_to_clipboard(v))
+            copy_btn.connect("clicked", self.on_copy_clicked, value)
             multiline_box.append(copy_btn)
             
             row.add_suffix(multiline_box)
@@ -184,7 +231,14 @@ class ProcessDetailsDialog(Adw.Window):
             value_box.set_hexpand(True)
             value_box.set_halign(Gtk.Align.END)
             
-            value_label = Gtk.Label(label=value)
+            # Pre-truncate very long values so Pango doesn't lay out text that
+            # is ellipsized away anyway; the copy button keeps the full value
+            if len(value) > _MAX_LABEL_CHARS:
+                label_value = value[:100] + '…' + value[-(_MAX_LABEL_CHARS - 101):]
+            else:
+                label_value = value
+            
+            value_label = Gtk.Label(label=label_value)
             value_label.set_selectable(True)
             value_label.set_ellipsize(Pango.EllipsizeMode.MIDDLE)
             value_label.set_max_width_chars(40)
@@ -199,23 +253,20 @@ class ProcessDetailsDialog(Adw.Window):
             copy_btn.add_css_class("flat")
             copy_btn.add_css_class("circular")
             copy_btn.set_valign(Gtk.Align.CENTER)
-            copy_btn.connect("clicked", lambda b, v=value: self.copy_to_clipboard(v))
+            copy_btn.connect("clicked", self.on_copy_clicked, value)
             value_box.append(copy_btn)
             
             row.add_suffix(value_box)
         
-        group.add(row)
+        if isinstance(group, Adw.ExpanderRow):
+            group.add_row(row)
+        else:
+            group.add(row)
+    
+    def on_copy_clicked(self, button, value):
+        """Handle a copy button click (value is passed as signal user data)."""
+        self.copy_to_clipboard(value)
     
     def copy_to_clipboard(self, text):
         """Copy text to clipboard."""
-        clipboard = Gdk.Display.get_default().get_clipboard()
-        clipboard.set(text)
-    
-    def on_key_pressed(self, controller, keyval, keycode, state):
-        """Handle key press events."""
-        # Escape: close the dialog
-        if keyval == Gdk.KEY_Escape:
-            self.close()
-            return True  # Event handled
-        
-        return False  # Let other handlers process
+        self._clipboard.set(text)
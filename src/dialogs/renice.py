@@ -5,6 +5,7 @@ import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 
+import threading
 from gi.repository import Gtk, Adw, GLib
 
 
@@ -61,9 +62,12 @@ class ReniceDialog(Adw.Window):
         
         # Current priority
         current_nice = self.processes[0]['nice']
-        current_label = Gtk.Label(label=f"Current priority: {current_nice}")
-        current_label.set_halign(Gtk.Align.START)
-        content_box.append(current_label)
+        if current_nice is not None:
+            current_label = Gtk.Label(label=f"Current priority: {current_nice}")
+            current_label.set_halign(Gtk.Align.START)
+            content_box.append(current_label)
+        else:
+            current_nice = 0  # Unknown (not opened from the processes tab)
         
         # Priority adjustment
         adj_group = Adw.PreferencesGroup()
@@ -107,25 +111,66 @@ class ReniceDialog(Adw.Window):
         """Apply the new nice value."""
         new_nice = int(self.nice_spin.get_value())
         
-        success_count = 0
-        failed = []
+        self.close()
         
+        # Skip duplicate PIDs and processes known to be at the target
+        # priority (nice is None when it was not known)
+        seen = set()
+        todo = []
         for proc in self.processes:
-            try:
-                self.process_manager.renice_process(proc['pid'], new_nice)
-                success_count += 1
-            except Exception as e:
-                failed.append(f"{proc['name']} (PID {proc['pid']}): {e}")
+            if proc['pid'] in seen:
+                continue
+            seen.add(proc['pid'])
+            if proc['nice'] != new_nice:
+                todo.append(proc)
+        
+        # Nothing to do if every process already has this priority
+        if not todo:
+            self.parent.show_error(f"Priority is already {new_nice}")
+            return
+        
+        # Renice all processes with one host call, off the GTK main loop
+        threading.Thread(
+            target=self._renice_worker,
+            args=(todo, new_nice, len(seen) - len(todo)),
+            daemon=True,
+            name="ProcessRenicer"
+        ).start()
+    
+    def _renice_worker(self, todo, new_nice, unchanged):
+        """Renice the given processes (runs in a background thread)."""
+        try:
+            errors = self.process_manager.renice_processes(
+                [proc['pid'] for proc in todo], new_nice
+            )
+        except Exception as e:
+            errors = {proc['pid']: str(e) for proc in todo}
+        GLib.idle_add(self._on_renice_done, todo, new_nice, errors, unchanged)
+    
+    def _on_renice_done(self, todo, new_nice, errors, unchanged):
+        """Report renice results (called from GLib.idle_add)."""
+        failed = [
+            f"{proc['name']} (PID {proc['pid']}): {errors[proc['pid']]}"
+            for proc in todo if proc['pid'] in errors
+        ]
+        success_count = len(todo) - len(failed)
         
         if failed:
             error_msg = f"Failed to change priority for:\n" + "\n".join(failed)
             self.parent.show_error(error_msg)
         else:
-            if len(self.processes) == 1:
+            if len(todo) == 1 and not unchanged:
                 self.parent.show_error(f"Priority changed to {new_nice}")
             else:
-                self.parent.show_error(f"Priority changed to {new_nice} for {success_count} processes")
-        
-        self.close()
-        # Refresh after a short delay
-        GLib.timeout_add(500, lambda: self.parent.refresh_processes())
+                message = f"Priority changed to {new_nice} for {success_count} processes"
+                if unchanged:
+                    message += f" ({unchanged} unchanged)"
+                self.parent.show_error(message)
+        
+        # Update the affected rows in place instead of re-listing all processes
+        if success_count:
+            self.parent.update_process_rows(
+                (proc['pid'], {'nice': new_nice})
+                for proc in todo if proc['pid'] not in errors
+            )
+        return False
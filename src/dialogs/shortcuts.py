@@ -5,7 +5,7 @@ import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 
-from gi.repository import Gtk, Adw, Gdk
+from gi.repository import Gtk, Adw
 
 
 class ShortcutsWindow(Adw.Window):
@@ -22,6 +22,8 @@ class ShortcutsWindow(Adw.Window):
             title="Keyboard Shortcuts",
             default_width=600,
             default_height=700,
+            hide_on_close=True,  # Kept and re-presented by the parent window
+            destroy_with_parent=True,
         )
         
         self.build_ui()
@@ -81,10 +83,13 @@ class ShortcutsWindow(Adw.Window):
         self.add_shortcut_row(app_group, "Show Keyboard Shortcuts", "? or Ctrl+?")
         self.add_shortcut_row(app_group, "Quit Application", "Ctrl+Q")
         
-        # Add key controller for Escape key
-        key_controller = Gtk.EventControllerKey()
-        key_controller.connect("key-pressed", self.on_key_pressed)
-        self.add_controller(key_controller)
+        # Close on Escape via GTK's shortcut engine (no Python callback per key press)
+        shortcut_controller = Gtk.ShortcutController()
+        shortcut_controller.add_shortcut(Gtk.Shortcut.new(
+            Gtk.ShortcutTrigger.parse_string("Escape"),
+            Gtk.NamedAction.new("window.close"),
+        ))
+        self.add_controller(shortcut_controller)
     
     def add_shortcut_row(self, group, action, shortcut):
         """Add a row with action and shortcut."""
@@ -93,18 +98,8 @@ class ShortcutsWindow(Adw.Window):
         
         # Shortcut label
         shortcut_label = Gtk.Label(label=shortcut)
-        shortcut_label.add_css_class("keycap")
-        shortcut_label.add_css_class("monospace")
+        shortcut_label.set_css_classes(["keycap", "monospace"])
         shortcut_label.set_halign(Gtk.Align.END)
         row.add_suffix(shortcut_label)
         
         group.add(row)
-    
-    def on_key_pressed(self, controller, keyval, keycode, state):
-        """Handle key press events."""
-        # Escape: close the window
-        if keyval == Gdk.KEY_Escape:
-            self.close()
-            return True  # Event handled
-        
-        return False  # Let other handlers process
@@ -1,9 +1,12 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 # Process termination dialog with status tracking
 
+import os
 import signal
+import threading
+from collections import defaultdict
 
-from ..ps_commands import is_process_running_via_host
+from ..ps_commands import are_processes_running_via_host, is_flatpak
 
 import gi
 gi.require_version('Gtk', '4.0')
@@ -35,18 +38,24 @@ class TerminationDialog(Adw.Window):
         self.process_manager = process_manager
         self.skip_confirmation = skip_confirmation
         
-        # Group processes by name
-        self.process_groups = {}
+        # Group processes by name and keep individual process tracking for status
+        self.process_groups = defaultdict(list)
+        self.processes = {}
         for p in processes:
             name = p['name']
             pid = p['pid']
-            if name not in self.process_groups:
-                self.process_groups[name] = []
             self.process_groups[name].append(pid)
+            self.processes[pid] = {'name': name, 'status': 'pending'}
         
-        # Keep individual process tracking for status
-        self.processes = {p['pid']: {'name': p['name'], 'status': 'pending'} for p in processes}
+        # Sort each group once; rows and kill actions reuse the sorted lists
+        for pids in self.process_groups.values():
+            pids.sort()
+        self.status_counts = {'pending': len(self.processes), 'running': 0, 'terminated': 0}
         self.check_timeout_id = None
+        self.recheck_idle_id = None
+        self.check_in_flight = False
+        self.closed = False
+        self.pidfd_watches = {}  # pid -> (pidfd, GLib source id)
         self.confirmed = skip_confirmation  # Start confirmed if skipping confirmation
         
         self.build_ui()
@@ -59,7 +68,7 @@ class TerminationDialog(Adw.Window):
         """Start the dialog in skip confirmation mode (already sent SIGTERM)."""
         # Mark all processes as running (they didn't terminate from SIGTERM)
         for pid in self.processes:
-            self.processes[pid]['status'] = 'running'
+            self.set_process_status(pid, 'running')
         
         # Hide confirmation buttons
         self.cancel_button.set_visible(False)
@@ -173,13 +182,18 @@ class TerminationDialog(Adw.Window):
         # Set title with count if multiple processes
         if len(pids) == 1:
             row.set_title(name)
-            row.set_subtitle(f"PID: {pids[0]}")
+            subtitle = f"PID: {pids[0]}"
+            running_subtitle = f"PID: {pids[0]} - Still running"
+            terminated_subtitle = f"PID: {pids[0]} - Terminated"
         else:
             row.set_title(f"{name} ({len(pids)})")
-            pids_str = ", ".join(str(pid) for pid in sorted(pids)[:5])
+            pids_str = ", ".join(map(str, pids[:5]))
             if len(pids) > 5:
                 pids_str += f", ... (+{len(pids) - 5} more)"
-            row.set_subtitle(f"PIDs: {pids_str}")
+            subtitle = f"PIDs: {pids_str}"
+            running_subtitle = None  # Depends on the counts
+            terminated_subtitle = f"{len(pids)} processes - All terminated"
+        row.set_subtitle(subtitle)
         
         # Status icon
         status_icon = Gtk.Image()
@@ -200,9 +214,35 @@ class TerminationDialog(Adw.Window):
             'row': row,
             'status_icon': status_icon,
             'kill_button': kill_button,
-            'pids': pids
+            'pids': pids,
+            'counts': {'pending': len(set(pids)), 'running': 0, 'terminated': 0},
+            'running_subtitle': running_subtitle,
+            'terminated_subtitle': terminated_subtitle,
+            # Last values shown, to skip redundant widget updates
+            'subtitle': subtitle,
+            'icon': "content-loading-symbolic",
+            'css_class': None,
         }
     
+    def set_process_status(self, pid, status):
+        """Change the status of a process, keeping the status counters in sync.
+        
+        Returns:
+            True if the status changed.
+        """
+        info = self.processes[pid]
+        old_status = info['status']
+        if old_status == status:
+            return False
+        
+        info['status'] = status
+        self.status_counts[old_status] -= 1
+        self.status_counts[status] += 1
+        row_counts = self.process_rows[info['name']]['counts']
+        row_counts[old_status] -= 1
+        row_counts[status] += 1
+        return True
+    
     def update_status_label(self):
         """Update the status label text."""
         if not self.confirmed:
@@ -212,8 +252,8 @@ class TerminationDialog(Adw.Window):
                 "Unsaved data may be lost."
             )
         else:
-            terminated = sum(1 for p in self.processes.values() if p['status'] == 'terminated')
-            running = sum(1 for p in self.processes.values() if p['status'] == 'running')
+            terminated = self.status_counts['terminated']
+            running = self.status_counts['running']
             total = len(self.processes)
             
             if running == 0:
@@ -238,36 +278,49 @@ class TerminationDialog(Adw.Window):
             return
         
         row_data = self.process_rows[name]
-        pids = row_data['pids']
-        
-        # Check status of all PIDs in this group
-        statuses = [self.processes[pid]['status'] for pid in pids if pid in self.processes]
+        counts = row_data['counts']
+        running_count = counts['running']
         
         # Determine overall status
-        if all(s == 'terminated' for s in statuses):
+        subtitle = row_data['subtitle']
+        css_class = None
+        if running_count == 0 and counts['pending'] == 0:
             # All terminated
-            row_data['status_icon'].set_from_icon_name("emblem-ok-symbolic")
-            row_data['status_icon'].add_css_class("success")
-            row_data['kill_button'].set_visible(False)
-            if len(pids) == 1:
-                row_data['row'].set_subtitle(f"PID: {pids[0]} - Terminated")
-            else:
-                row_data['row'].set_subtitle(f"{len(pids)} processes - All terminated")
-        elif any(s == 'running' for s in statuses):
+            icon = "emblem-ok-symbolic"
+            css_class = "success"
+            subtitle = row_data['terminated_subtitle']
+        elif running_count:
             # Some still running
-            row_data['status_icon'].set_from_icon_name("dialog-warning-symbolic")
-            row_data['status_icon'].add_css_class("warning")
-            row_data['kill_button'].set_visible(True)
-            running_count = sum(1 for s in statuses if s == 'running')
-            terminated_count = sum(1 for s in statuses if s == 'terminated')
-            if len(pids) == 1:
-                row_data['row'].set_subtitle(f"PID: {pids[0]} - Still running")
-            else:
-                row_data['row'].set_subtitle(f"{running_count} running, {terminated_count} terminated")
+            icon = "dialog-warning-symbolic"
+            css_class = "warning"
+            subtitle = row_data['running_subtitle'] or (
+                f"{running_count} running, {counts['terminated']} terminated"
+            )
         else:
             # All pending
-            row_data['status_icon'].set_from_icon_name("content-loading-symbolic")
-            row_data['kill_button'].set_visible(False)
+            icon = "content-loading-symbolic"
+        
+        if icon != row_data['icon']:
+            row_data['icon'] = icon
+            row_data['status_icon'].set_from_icon_name(icon)
+            self._set_icon_css_class(row_data, css_class)
+            row_data['kill_button'].set_visible(running_count > 0)
+        
+        if subtitle != row_data['subtitle']:
+            row_data['subtitle'] = subtitle
+            row_data['row'].set_subtitle(subtitle)
+    
+    def _set_icon_css_class(self, row_data, css_class):
+        """Swap the status icon's state class (success/warning) if it changed."""
+        old_class = row_data['css_class']
+        if old_class == css_class:
+            return
+        status_icon = row_data['status_icon']
+        if old_class:
+            status_icon.remove_css_class(old_class)
+        if css_class:
+            status_icon.add_css_class(css_class)
+        row_data['css_class'] = css_class
     
     def on_cancel(self, button):
         """Handle cancel button click."""
@@ -284,96 +337,207 @@ class TerminationDialog(Adw.Window):
         # Show close button
         self.close_button.set_visible(True)
         
-        # Send SIGTERM to all processes
+        # Send SIGTERM to all processes with one host call
+        try:
+            errors = self.process_manager.kill_processes(self.processes, signal.SIGTERM)
+        except Exception as e:
+            errors = dict.fromkeys(self.processes, str(e))
         for pid in self.processes:
-            try:
-                self.process_manager.kill_process(pid, signal.SIGTERM)
-                self.processes[pid]['status'] = 'running'  # Will be checked
-            except Exception:
-                pass  # Process might already be gone
+            if pid not in errors:  # Failed ones might already be gone
+                self.set_process_status(pid, 'running')  # Will be checked
+        
+        # Show the new state; later checks only refresh rows that change
+        for name in self.process_rows:
+            self.update_process_row(name)
+        self.update_status_label()
         
         # Start checking process status
         self.start_status_check()
     
     def start_status_check(self):
-        """Start periodic check of process status."""
+        """Start tracking process status.
+        
+        Processes that can be watched through a pidfd are reported as soon
+        as they exit; the rest are polled once a second.
+        """
+        self.watch_process_exits()
+        self.check_timeout_id = GLib.timeout_add_seconds(1, self.check_processes_status)
         self.check_processes_status()
-        self.check_timeout_id = GLib.timeout_add(500, self.check_processes_status)
+    
+    def watch_process_exits(self):
+        """Register a pidfd watch for every running process.
+        
+        Not available in Flatpak, where host PIDs belong to another PID
+        namespace, nor without os.pidfd_open (Python 3.9+, Linux 5.3+).
+        Processes that cannot be watched are left to check_processes_status.
+        """
+        if is_flatpak() or not hasattr(os, 'pidfd_open'):
+            return
+        
+        for pid, info in self.processes.items():
+            if info['status'] != 'running' or pid in self.pidfd_watches:
+                continue
+            try:
+                pidfd = os.pidfd_open(pid)
+            except OSError:
+                continue  # Already gone or unsupported kernel, polling handles it
+            source_id = GLib.unix_fd_add_full(
+                GLib.PRIORITY_DEFAULT, pidfd, GLib.IOCondition.IN,
+                self._on_pidfd_ready, pid
+            )
+            self.pidfd_watches[pid] = (pidfd, source_id)
+    
+    def _on_pidfd_ready(self, pidfd, condition, pid):
+        """Mark a watched process as terminated (its pidfd became readable)."""
+        del self.pidfd_watches[pid]
+        os.close(pidfd)
+        
+        self.set_process_status(pid, 'terminated')
+        self.update_process_row(self.processes[pid]['name'])
+        self.update_status_label()
+        
+        if not self.status_counts['running']:
+            self.kill_all_button.set_visible(False)
+        
+        return False  # Remove the watch
     
     def check_processes_status(self):
-        """Check if processes are still running."""
+        """Check if processes are still running.
+        
+        The host query runs in a background thread so the dialog stays
+        responsive; the results are applied by _apply_status_results.
+        """
+        if self.check_in_flight:
+            return True  # Previous check still running
+        
+        # Exit of watched processes is reported by _on_pidfd_ready
+        to_check = [
+            pid for pid, info in self.processes.items()
+            if info['status'] != 'terminated' and pid not in self.pidfd_watches
+        ]
+        if not to_check:
+            # Nothing left to poll: update the kill button and stop the timer
+            self._apply_status_results(to_check, set())
+            return False
+        
+        self.check_in_flight = True
+        threading.Thread(
+            target=self._check_status_worker,
+            args=(to_check,),
+            daemon=True,
+            name="ProcessStatusCheck"
+        ).start()
+        return True  # Continue checking
+    
+    def _check_status_worker(self, to_check):
+        """Query which processes are still running (runs in a background thread)."""
+        try:
+            running_pids = are_processes_running_via_host(to_check)
+        except Exception:
+            running_pids = None
+        GLib.idle_add(self._apply_status_results, to_check, running_pids)
+    
+    def _apply_status_results(self, to_check, running_pids):
+        """Apply a status check result (called from GLib.idle_add).
+        
+        running_pids is None if the check failed; statuses are then left
+        as they are and the check is retried on the next tick.
+        """
+        self.check_in_flight = False
+        if running_pids is None:
+            if self.check_timeout_id is None and not self.closed:
+                self.check_timeout_id = GLib.timeout_add_seconds(1, self.check_processes_status)
+            return False
+        
         all_terminated = True
-        any_running = False
+        any_running = bool(self.pidfd_watches)
         
-        for pid in self.processes:
-            if self.processes[pid]['status'] == 'terminated':
-                continue
-            
-            # Check if process is still running
-            if self.is_process_running(pid):
-                self.processes[pid]['status'] = 'running'
+        changed_groups = set()
+        for pid in to_check:
+            if pid in running_pids:
+                status = 'running'
                 all_terminated = False
                 any_running = True
             else:
-                self.processes[pid]['status'] = 'terminated'
+                status = 'terminated'
+            if self.set_process_status(pid, status):
+                changed_groups.add(self.processes[pid]['name'])
         
-        # Update all process group rows
-        for name in self.process_rows:
-            self.update_process_row(name)
-        
-        # Update status label
-        self.update_status_label()
+        # Only touch the widgets when some status actually changed
+        if changed_groups:
+            for name in changed_groups:
+                self.update_process_row(name)
+            self.update_status_label()
         
         # Show/hide kill all button
-        self.kill_all_button.set_visible(any_running)
-        if any_running:
-            self.kill_all_button.grab_focus()
+        if any_running != self.kill_all_button.get_visible():
+            self.kill_all_button.set_visible(any_running)
+            if any_running:
+                self.kill_all_button.grab_focus()
         
-        # If all terminated, stop checking
+        # If all terminated (or left to pidfd watches), stop polling
         if all_terminated:
             self.stop_status_check()
-            return False
         
-        return True  # Continue checking
-    
-    def is_process_running(self, pid):
-        """Check if a process is still running."""
-        return is_process_running_via_host(pid)
+        return False  # Don't repeat
     
     def on_kill_group(self, name, pids):
         """Handle kill button for a process group."""
-        errors = []
+        running = []
         for pid in pids:
-            if pid in self.processes and self.processes[pid]['status'] == 'running':
-                try:
-                    self.process_manager.kill_process(pid, signal.SIGKILL)
-                except Exception as e:
-                    errors.append(f"PID {pid}: {e}")
+            info = self.processes.get(pid)
+            if info and info['status'] == 'running':
+                running.append(pid)
+        
+        failed = self._kill_running(running)
+        errors = [f"PID {pid}: {e}" for pid, e in failed.items()]
         
         # Show error toast if any kills failed
         if errors and self.parent_window:
             self._show_kill_error(errors)
         
-        # Immediately check status
-        GLib.timeout_add(100, self.check_processes_status)
+        self.schedule_recheck()
     
     def on_kill_all(self, button):
         """Handle kill all button - send SIGKILL to all running processes."""
-        errors = []
-        for pid, info in self.processes.items():
-            if info['status'] == 'running':
-                try:
-                    self.process_manager.kill_process(pid, signal.SIGKILL)
-                except Exception as e:
-                    process_name = info.get('name', 'Unknown')
-                    errors.append(f"{process_name} (PID {pid}): {e}")
+        running = [pid for pid, info in self.processes.items() if info['status'] == 'running']
+        
+        failed = self._kill_running(running)
+        errors = [
+            f"{self.processes[pid].get('name', 'Unknown')} (PID {pid}): {e}"
+            for pid, e in failed.items()
+        ]
         
         # Show error toast if any kills failed
         if errors and self.parent_window:
             self._show_kill_error(errors)
         
-        # Immediately check status
-        GLib.timeout_add(100, self.check_processes_status)
+        self.schedule_recheck()
+    
+    def _kill_running(self, pids):
+        """Send SIGKILL to the given processes with one host call.
+        
+        Returns:
+            Dictionary mapping each PID that failed to its error message.
+        """
+        try:
+            return self.process_manager.kill_processes(pids, signal.SIGKILL)
+        except Exception as e:
+            return dict.fromkeys(pids, str(e))
+    
+    def schedule_recheck(self):
+        """Recheck status once the main loop is idle.
+        
+        Repeated requests before the check runs are coalesced into one.
+        """
+        if self.recheck_idle_id is None:
+            self.recheck_idle_id = GLib.idle_add(self._recheck_status)
+    
+    def _recheck_status(self):
+        """One-shot status check (called from GLib.idle_add)."""
+        self.recheck_idle_id = None
+        self.check_processes_status()
+        return False  # Don't repeat
     
     def _show_kill_error(self, errors):
         """Show kill errors as toast notification."""
@@ -414,14 +578,26 @@ class TerminationDialog(Adw.Window):
         return False
     
     def stop_status_check(self):
-        """Stop the status check timer."""
+        """Stop the status check timer and any pending recheck."""
         if self.check_timeout_id:
             GLib.source_remove(self.check_timeout_id)
             self.check_timeout_id = None
+        if self.recheck_idle_id:
+            GLib.source_remove(self.recheck_idle_id)
+            self.recheck_idle_id = None
+    
+    def stop_process_watches(self):
+        """Remove all pidfd watches and close their file descriptors."""
+        for pidfd, source_id in self.pidfd_watches.values():
+            GLib.source_remove(source_id)
+            os.close(pidfd)
+        self.pidfd_watches.clear()
     
     def cleanup_and_close(self):
         """Clean up and close the dialog."""
+        self.closed = True
         self.stop_status_check()
+        self.stop_process_watches()
         self.close()
         
         # Remove terminated processes from parent's persistent selection
@@ -429,4 +605,4 @@ class TerminationDialog(Adw.Window):
             for pid, info in self.processes.items():
                 if info['status'] == 'terminated' and pid in self.parent_window.selected_pids:
                     del self.parent_window.selected_pids[pid]
-            GLib.timeout_add(100, self.parent_window.refresh_processes)
+            GLib.idle_add(self.parent_window.refresh_processes)
@@ -115,8 +115,14 @@ class ProcessActionsMixin:
         dialog.present()
     
     def show_shortcuts(self):
-        """Show keyboard shortcuts window."""
-        shortcuts_window = ShortcutsWindow(self)
+        """Show keyboard shortcuts window.
+        
+        The window content is static, so it is built once and re-presented.
+        """
+        shortcuts_window = getattr(self, '_shortcuts_window', None)
+        if shortcuts_window is None:
+            shortcuts_window = ShortcutsWindow(self)
+            self._shortcuts_window = shortcuts_window
         shortcuts_window.present()
     
     def kill_processes_direct(self, processes):
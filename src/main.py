@@ -27,6 +27,9 @@ if TYPE_CHECKING:
 class ProcessManagerApplication(Adw.Application):
     """Main application class with single-instance support."""
     
+    # Application-wide CSS provider, registered on the display only once
+    _css_provider: Optional[Gtk.CssProvider] = None
+    
     def __init__(self) -> None:
         super().__init__(
             application_id=APP_ID,
@@ -74,10 +77,17 @@ class ProcessManagerApplication(Adw.Application):
         self.set_accels_for_action("app.shortcuts", ["<Control>question"])
     
     def _load_css(self) -> None:
-        """Load application CSS styles from external file."""
+        """Load application CSS styles from external file.
+        
+        The styles are parsed into a single provider and added to the
+        default display once; later calls are no-ops.
+        """
         import os
         from pathlib import Path
         
+        if ProcessManagerApplication._css_provider is not None:
+            return
+        
         css_provider = Gtk.CssProvider()
         
         # Try multiple locations for CSS file
@@ -96,14 +106,18 @@ class ProcessManagerApplication(Adw.Application):
                 break
         else:
             # Fallback: load inline CSS if file not found
-            from .constants import APP_CSS
-            css_provider.load_from_data(APP_CSS.encode())
+            from .constants import APP_CSS, APP_CSS_BYTES
+            if hasattr(css_provider, 'load_from_bytes'):  # GTK >= 4.12
+                css_provider.load_from_bytes(APP_CSS_BYTES)
+            else:
+                css_provider.load_from_data(APP_CSS.encode())
         
         Gtk.StyleContext.add_provider_for_display(
             Gdk.Display.get_default(),
             css_provider,
             Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
         )
+        ProcessManagerApplication._css_provider = css_provider
     
     def do_activate(self) -> None:
         """Handle application activation (single instance)."""
@@ -7,19 +7,28 @@ from __future__ import annotations
 
 import os
 import signal
-from typing import TYPE_CHECKING, Dict, List, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Any
+
+from gi.repository import GLib
 
 from .ps_commands import (
     get_processes_via_ps,
     get_process_details_via_ps,
     kill_process_via_host,
+    kill_processes_via_host,
     renice_process_via_host,
+    renice_processes_via_host,
 )
 
 if TYPE_CHECKING:
     from signal import Signals
 
 
+# Fields returned by get_process_details() (environ is fetched
+# separately on demand, see get_environ())
+_DETAIL_FIELDS = ('cmdline', 'cwd', 'exe', 'fd_count', 'threads')
+
 # Signal number to name mapping
 _SIGNAL_NAMES: Dict[int, str] = {
     signal.SIGTERM: 'TERM',
@@ -38,6 +47,10 @@ class ProcessManager:
     change process priority, and get detailed process information.
     """
     
+    def __init__(self) -> None:
+        # Single reusable worker for details queries off the GTK main loop
+        self._details_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ProcessDetails")
+    
     def get_processes(
         self,
         show_all: bool = True,
@@ -60,6 +73,21 @@ class ProcessManager:
         current_uid = os.getuid()
         return get_processes_via_ps(current_uid, my_processes, active_only, show_kernel_threads)
     
+    def get_processes_by_pids(self, pids: Iterable[int]) -> List[Dict[str, Any]]:
+        """Get information for specific processes only.
+        
+        Unlike get_processes(), this queries just the given PIDs instead of
+        the whole process table. PIDs that no longer exist are omitted.
+        
+        Args:
+            pids: The process IDs to look up.
+            
+        Returns:
+            List of process dictionaries with the same keys as get_processes().
+        """
+        current_uid = os.getuid()
+        return get_processes_via_ps(current_uid, False, False, True, pids=pids)
+    
     def kill_process(self, pid: int, signal_num: int = signal.SIGTERM) -> None:
         """Send a signal to a process.
         
@@ -73,6 +101,19 @@ class ProcessManager:
         signal_name = _SIGNAL_NAMES.get(signal_num, str(signal_num))
         kill_process_via_host(pid, signal_name)
     
+    def kill_processes(self, pids: Iterable[int], signal_num: int = signal.SIGTERM) -> Dict[int, str]:
+        """Send a signal to several processes at once.
+        
+        Args:
+            pids: The process IDs to signal.
+            signal_num: The signal to send (default: SIGTERM).
+            
+        Returns:
+            Dictionary mapping each PID that failed to its error message.
+        """
+        signal_name = _SIGNAL_NAMES.get(signal_num, str(signal_num))
+        return kill_processes_via_host(pids, signal_name)
+    
     def renice_process(self, pid: int, nice_value: int) -> None:
         """Change the nice value of a process.
         
@@ -86,13 +127,69 @@ class ProcessManager:
         """
         renice_process_via_host(pid, nice_value)
     
+    def renice_processes(self, pids: Iterable[int], nice_value: int) -> Dict[int, str]:
+        """Change the nice value of several processes at once.
+        
+        Args:
+            pids: The process IDs to renice.
+            nice_value: The new nice value (-20 to 19).
+            
+        Returns:
+            Dictionary mapping each PID that failed to its error message.
+        """
+        return renice_processes_via_host(pids, nice_value)
+    
     def get_process_details(self, pid: int) -> Dict[str, Any]:
         """Get detailed information about a process.
         
+        The environment is not included; use get_environ() when it is needed.
+        
+        Args:
+            pid: The process ID to get details for.
+            
+        Returns:
+            Dictionary with process details: cmdline, cwd, exe, fd_count, threads
+        """
+        return get_process_details_via_ps(pid, _DETAIL_FIELDS)
+    
+    def get_process_details_async(
+        self,
+        pid: int,
+        callback: Callable[[Dict[str, Any]], Any]
+    ) -> None:
+        """Get process details in a background thread.
+        
         Args:
             pid: The process ID to get details for.
+            callback: Called with the details dict on the GLib main loop
+                (via GLib.idle_add), so it may update widgets.
+        """
+        def work() -> None:
+            details = self.get_process_details(pid)
+            GLib.idle_add(callback, details)
+        
+        self._details_executor.submit(work)
+    
+    def get_environ(self, pid: int) -> str:
+        """Get the environment variables of a process.
+        
+        Args:
+            pid: The process ID to read the environment of.
             
         Returns:
-            Dictionary with process details: cmdline, cwd, exe, environ, fd_count, threads
+            Newline-separated NAME=value entries, or an 'N/A ...' message.
         """
-        return get_process_details_via_ps(pid)
+        return get_process_details_via_ps(pid, ('environ',))['environ']
+    
+    def get_environ_async(self, pid: int, callback: Callable[[str], Any]) -> None:
+        """Get the environment variables of a process in a background thread.
+        
+        Args:
+            pid: The process ID to read the environment of.
+            callback: Called with the result of get_environ() on the GLib
+                main loop (via GLib.idle_add), so it may update widgets.
+        """
+        def work() -> None:
+            GLib.idle_add(callback, self.get_environ(pid))
+        
+        self._details_executor.submit(work)
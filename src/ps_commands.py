@@ -6,8 +6,10 @@
 from __future__ import annotations
 
 import os
+import re
+import shutil
 import subprocess
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
 
 
 def is_flatpak() -> bool:
@@ -19,21 +21,21 @@ def is_flatpak() -> bool:
     return os.path.exists('/.flatpak-info')
 
 
-def run_host_command(cmd: List[str], timeout: int = 5) -> str:
+def run_host_command(cmd: Sequence[str], timeout: int = 5) -> str:
     """Run a command on the host system using flatpak-spawn.
     
     When running in Flatpak, uses flatpak-spawn --host to execute
     commands on the host system. Otherwise, runs the command directly.
     
     Args:
-        cmd: List of command arguments to execute.
+        cmd: Command arguments to execute (list or tuple).
         timeout: Maximum time in seconds to wait for the command (default: 5).
         
     Returns:
         The stdout output of the command as a string.
     """
     if is_flatpak():
-        full_cmd = ['flatpak-spawn', '--host'] + cmd
+        full_cmd = ['flatpak-spawn', '--host', *cmd]
     else:
         full_cmd = cmd
     
@@ -44,11 +46,27 @@ def run_host_command(cmd: List[str], timeout: int = 5) -> str:
         return ""
 
 
+def host_command_exists(name: str) -> bool:
+    """Check whether a command is available on the host system.
+    
+    Args:
+        name: The command name to look up in the host's PATH.
+        
+    Returns:
+        True if the command was found, False otherwise.
+    """
+    if is_flatpak():
+        output = run_host_command(['sh', '-c', 'command -v "$1"', 'sh', name])
+        return bool(output.strip())
+    return shutil.which(name) is not None
+
+
 def get_processes_via_ps(
     current_uid: int,
     my_processes: bool,
     active_only: bool,
-    show_kernel_threads: bool
+    show_kernel_threads: bool,
+    pids: Optional[Iterable[int]] = None
 ) -> List[Dict[str, Any]]:
     """Get processes using ps command.
     
@@ -57,6 +75,8 @@ def get_processes_via_ps(
         my_processes: If True, only return processes owned by current user.
         active_only: If True, only return processes with CPU > 0.1%.
         show_kernel_threads: If True, include kernel threads in results.
+        pids: Optional PIDs to query; if given, only these processes are
+            read instead of the whole process table.
         
     Returns:
         List of process dictionaries with keys:
@@ -77,10 +97,18 @@ def get_processes_via_ps(
         'eyl': '09', 'eki': '10', 'kas': '11', 'ara': '12',
     }
     
+    if pids is not None:
+        pid_list = ','.join(str(pid) for pid in pids)
+        if not pid_list:
+            return processes
+        select_args = ['-p', pid_list, '-o']
+    else:
+        select_args = ['-eo']
+    
     try:
         # Use ps with custom format to get all needed info
         # pid, comm, %cpu, rss (in KB), lstart, user, nice, uid, state, ppid
-        cmd = ['ps', '-eo', 'pid,comm,%cpu,rss,lstart,user,nice,uid,state,ppid', '--no-headers']
+        cmd = ['ps'] + select_args + ['pid,comm,%cpu,rss,lstart,user,nice,uid,state,ppid', '--no-headers']
         output = run_host_command(cmd)
         
         for line in output.strip().split('\n'):
@@ -164,78 +192,94 @@ def get_processes_via_ps(
     return processes
 
 
-def get_process_details_via_ps(pid: int) -> Dict[str, Any]:
+# Marker line printed between the sections of a batched details query
+_DETAILS_SEPARATOR = '--process-manager-details--'
+
+# Shell snippets printing each detail field for the PID passed as "$1"
+_DETAILS_SNIPPETS: Dict[str, str] = {
+    'cmdline': 'ps -p "$1" -o args=',
+    'cwd': 'readlink "/proc/$1/cwd"',
+    'exe': 'readlink -f "/proc/$1/exe"',
+    'environ': 'cat "/proc/$1/environ"',
+    'fd_count': 'ls -1 "/proc/$1/fd" | wc -l',
+    'threads': 'ps -p "$1" -o nlwp=',
+}
+
+
+def _query_process_details(pid: int, fields: List[str]) -> Dict[str, str]:
+    """Read several detail fields of a process with a single host command.
+    
+    All snippets run in one shell invocation (one flatpak-spawn round trip
+    when sandboxed) and their outputs are separated by a marker line.
+    
+    Args:
+        pid: The process ID to query.
+        fields: Keys of _DETAILS_SNIPPETS to read, in output order.
+        
+    Returns:
+        Dictionary mapping each field to its raw output ('' if unavailable).
+    """
+    script = '; echo "$2"; '.join(_DETAILS_SNIPPETS[field] for field in fields)
+    cmd = ['sh', '-c', script, 'sh', str(pid), _DETAILS_SEPARATOR]
+    output = run_host_command(cmd)
+    sections = output.split(_DETAILS_SEPARATOR + '\n', len(fields) - 1)
+    sections += [''] * (len(fields) - len(sections))
+    return dict(zip(fields, sections))
+
+
+def get_process_details_via_ps(pid: int, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
     """Get detailed information about a process using ps and other commands.
     
     Args:
         pid: The process ID to get details for.
+        fields: Optional subset of detail keys to read (default: all).
         
     Returns:
         Dictionary with process details: cmdline, cwd, exe, environ, fd_count, threads
+        (or only the requested subset).
     """
     details: Dict[str, Any] = {}
+    wanted = list(_DETAILS_SNIPPETS) if fields is None else [f for f in _DETAILS_SNIPPETS if f in fields]
+    if not wanted:
+        return details
     
     try:
-        # Get command line using ps
-        cmd = ['ps', '-p', str(pid), '-o', 'args=']
-        output = run_host_command(cmd).strip()
-        details['cmdline'] = output if output else '[kernel thread]'
+        raw = _query_process_details(pid, wanted)
     except (OSError, subprocess.SubprocessError):
-        details['cmdline'] = 'N/A'
+        raw = dict.fromkeys(wanted, '')
     
-    try:
-        # Get working directory using pwdx
-        cmd = ['pwdx', str(pid)]
-        output = run_host_command(cmd).strip()
-        # Output format: "pid: /path/to/cwd"
-        if ':' in output:
-            details['cwd'] = output.split(':', 1)[1].strip()
-        else:
-            details['cwd'] = 'N/A'
-    except (OSError, subprocess.SubprocessError):
-        details['cwd'] = 'N/A'
+    if 'cmdline' in raw:
+        output = raw['cmdline'].strip()
+        details['cmdline'] = output if output else '[kernel thread]'
     
-    try:
-        # Get executable path using readlink
-        cmd = ['readlink', '-f', f'/proc/{pid}/exe']
-        output = run_host_command(cmd).strip()
+    if 'cwd' in raw:
+        output = raw['cwd'].strip()
+        details['cwd'] = output if output else 'N/A'
+    
+    if 'exe' in raw:
+        output = raw['exe'].strip()
         details['exe'] = output if output else 'N/A'
-    except (OSError, subprocess.SubprocessError):
-        details['exe'] = 'N/A'
     
-    try:
-        # Get environment variables using cat
-        cmd = ['cat', f'/proc/{pid}/environ']
-        output = run_host_command(cmd)
+    if 'environ' in raw:
+        output = raw['environ']
         if output:
             environ = output.replace('\x00', '\n')
             details['environ'] = environ[:2000] if environ else 'N/A'
         else:
             details['environ'] = 'N/A (permission denied or process not accessible)'
-    except (OSError, subprocess.SubprocessError) as e:
-        # Check if it's a permission error
-        error_str = str(e).lower()
-        if 'permission denied' in error_str or 'access denied' in error_str:
-            details['environ'] = 'N/A (permission denied - run with appropriate privileges)'
-        else:
-            details['environ'] = f'N/A (error: {str(e)})'
     
-    try:
-        # Get file descriptor count using ls
-        cmd = ['ls', '-1', f'/proc/{pid}/fd']
-        output = run_host_command(cmd)
-        fd_count = len(output.strip().split('\n')) if output.strip() else 0
-        details['fd_count'] = fd_count
-    except (OSError, subprocess.SubprocessError):
-        details['fd_count'] = 0
+    if 'fd_count' in raw:
+        try:
+            details['fd_count'] = int(raw['fd_count'].strip() or 0)
+        except ValueError:
+            details['fd_count'] = 0
     
-    try:
-        # Get thread count using ps
-        cmd = ['ps', '-p', str(pid), '-o', 'nlwp=']
-        output = run_host_command(cmd).strip()
-        details['threads'] = int(output) if output else 1
-    except (OSError, subprocess.SubprocessError, ValueError):
-        details['threads'] = 1
+    if 'threads' in raw:
+        try:
+            output = raw['threads'].strip()
+            details['threads'] = int(output) if output else 1
+        except ValueError:
+            details['threads'] = 1
     
     return details
 
@@ -266,6 +310,59 @@ def kill_process_via_host(pid: int, signal_name: str) -> None:
         raise ProcessLookupError(error_msg)
 
 
+# Per-PID kill errors: procps/bash "kill: (1234) - No such process" and
+# util-linux "kill: sending signal to 1234 failed: No such process"
+_KILL_ERROR_RE = re.compile(
+    r'\((?P<pid>\d+)\)(?::| -) (?P<msg>.*)$'
+    r'|sending signal to (?P<pid2>\d+) failed: (?P<msg2>.*)$'
+)
+
+
+def kill_processes_via_host(pids: Iterable[int], signal_name: str) -> Dict[int, str]:
+    """Send a signal to several processes with a single kill call.
+    
+    Args:
+        pids: The process IDs to signal.
+        signal_name: The signal name (e.g., 'TERM', 'KILL', 'INT').
+        
+    Returns:
+        Dictionary mapping each PID that could not be signalled to its
+        error message. Empty if the signal was sent to all processes.
+    """
+    pid_args = [str(pid) for pid in pids]
+    if not pid_args:
+        return {}
+    
+    cmd = ['kill', f'-{signal_name}'] + pid_args
+    
+    if is_flatpak():
+        full_cmd = ['flatpak-spawn', '--host'] + cmd
+    else:
+        full_cmd = cmd
+    
+    result = subprocess.run(full_cmd, capture_output=True, text=True)
+    if result.returncode == 0:
+        return {}
+    
+    errors: Dict[int, str] = {}
+    for line in result.stderr.splitlines():
+        match = _KILL_ERROR_RE.search(line)
+        if match:
+            pid = match.group('pid') or match.group('pid2')
+            errors[int(pid)] = match.group('msg') or match.group('msg2')
+    
+    if not errors:
+        # Unrecognised failure output: attribute it to the PIDs that are
+        # still around (processes that are gone cannot have failed)
+        error_msg = result.stderr.strip() or f"Failed to send {signal_name} to processes"
+        alive = are_processes_running_via_host(int(pid) for pid in pid_args)
+        errors = {
+            int(pid): error_msg for pid in pid_args
+            if alive is None or int(pid) in alive
+        }
+    return errors
+
+
 def is_process_running_via_host(pid: int) -> bool:
     """Check if a process is running on the host system.
     
@@ -296,6 +393,44 @@ def is_process_running_via_host(pid: int) -> bool:
     return False
 
 
+def are_processes_running_via_host(pids: Iterable[int]) -> Optional[Set[int]]:
+    """Check which of the given processes are running on the host system.
+    
+    Uses a single ps invocation for all PIDs instead of one kill -0
+    call per process. Unlike kill -0, ps also reports processes that
+    we are not permitted to signal.
+    
+    Args:
+        pids: The process IDs to check.
+        
+    Returns:
+        Set of the PIDs that are still running, or None if ps failed or
+        timed out (the result is unknown, not "none running").
+    """
+    pid_list = ','.join(str(pid) for pid in pids)
+    if not pid_list:
+        return set()
+    
+    cmd = ['ps', '-o', 'pid=', '-p', pid_list]
+    if is_flatpak():
+        cmd = ['flatpak-spawn', '--host'] + cmd
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+    # ps exits with 1 when none of the PIDs exist; anything else is an error
+    if result.returncode not in (0, 1):
+        return None
+    
+    running: Set[int] = set()
+    for line in result.stdout.split():
+        try:
+            running.add(int(line))
+        except ValueError:
+            continue
+    return running
+
+
 def renice_process_via_host(pid: int, nice_value: int) -> None:
     """Change the nice value of a process.
     
@@ -320,3 +455,47 @@ def renice_process_via_host(pid: int, nice_value: int) -> None:
         if 'Permission denied' in error_msg or 'permission denied' in error_msg.lower():
             raise PermissionError(error_msg)
         raise ProcessLookupError(error_msg)
+
+
+# Matches renice's per-PID error lines, e.g.
+# "renice: failed to set priority for 1234 (process ID): Permission denied"
+_RENICE_ERROR_RE = re.compile(r'for (\d+) \(process ID\): (.*)$')
+
+
+def renice_processes_via_host(pids: Iterable[int], nice_value: int) -> Dict[int, str]:
+    """Change the nice value of several processes with a single renice call.
+    
+    Args:
+        pids: The process IDs to renice.
+        nice_value: The new nice value (-20 to 19).
+        
+    Returns:
+        Dictionary mapping each PID that could not be reniced to its error
+        message. Empty if all processes were reniced.
+    """
+    pid_args = [str(pid) for pid in pids]
+    if not pid_args:
+        return {}
+    
+    cmd = ['renice', str(nice_value), '-p'] + pid_args
+    
+    if is_flatpak():
+        full_cmd = ['flatpak-spawn', '--host'] + cmd
+    else:
+        full_cmd = cmd
+    
+    result = subprocess.run(full_cmd, capture_output=True, text=True)
+    if result.returncode == 0:
+        return {}
+    
+    errors: Dict[int, str] = {}
+    for line in result.stderr.splitlines():
+        match = _RENICE_ERROR_RE.search(line)
+        if match:
+            errors[int(match.group(1))] = match.group(2)
+    
+    if not errors:
+        # Unrecognised failure output: attribute it to every PID
+        error_msg = result.stderr.strip() or "Failed to renice process"
+        errors = {int(pid): error_msg for pid in pid_args}
+    return errors
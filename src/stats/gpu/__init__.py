@@ -12,6 +12,7 @@ from __future__ import annotations
 
 import threading
 import time
+from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor
 from typing import TYPE_CHECKING, Dict, List, Optional, Any, Callable
 
@@ -99,6 +100,10 @@ class GPUStats:
                 self._update_thread = None
         else:
             self._update_thread = None
+        
+        # Stop helper processes (e.g. intel_gpu_top) while not monitoring
+        for provider in self._providers.values():
+            provider.close()
     
     def _background_update_loop(self) -> None:
         """Background thread loop that periodically updates GPU data."""
@@ -145,33 +150,34 @@ class GPUStats:
                 except Exception:
                     results[name] = {} if 'procs' in name else {'gpu_usage': 0.0, 'encoding': 0.0, 'decoding': 0.0}
         
-        # Merge process data from all providers
+        # Merge process data from all providers (summing per PID)
+        merged: Dict[int, Dict[str, Any]] = defaultdict(lambda: {
+            'gpu_usage': 0.0,
+            'gpu_memory': 0,
+            'encoding': 0.0,
+            'decoding': 0.0,
+            'gpu_type': ''
+        })
         for vendor in self._providers.keys():
             procs_key = f'{vendor}_procs'
             if procs_key in results:
                 for pid, info in results[procs_key].items():
-                    if pid not in processes:
-                        processes[pid] = {}
-                    
-                    # Merge GPU usage
-                    current_usage = processes[pid].get('gpu_usage', 0)
-                    new_usage = info.get('gpu_usage', 0)
-                    processes[pid]['gpu_usage'] = current_usage + new_usage
-                    
-                    # Merge other stats
-                    processes[pid]['gpu_memory'] = processes[pid].get('gpu_memory', 0) + info.get('gpu_memory', 0)
-                    processes[pid]['encoding'] = processes[pid].get('encoding', 0) + info.get('encoding', 0)
-                    processes[pid]['decoding'] = processes[pid].get('decoding', 0) + info.get('decoding', 0)
-                    processes[pid]['gpu_type'] = vendor
+                    entry = merged[pid]
+                    entry['gpu_usage'] += info.get('gpu_usage', 0)
+                    entry['gpu_memory'] += info.get('gpu_memory', 0)
+                    entry['encoding'] += info.get('encoding', 0)
+                    entry['decoding'] += info.get('decoding', 0)
+                    entry['gpu_type'] = vendor
+        processes = dict(merged)
         
         # Merge total stats (take max across vendors)
-        for vendor in self._providers.keys():
-            stats_key = f'{vendor}_stats'
-            if stats_key in results:
-                stats = results[stats_key]
-                total_stats['total_gpu_usage'] = max(total_stats['total_gpu_usage'], stats.get('gpu_usage', 0))
-                total_stats['total_encoding'] = max(total_stats['total_encoding'], stats.get('encoding', 0))
-                total_stats['total_decoding'] = max(total_stats['total_decoding'], stats.get('decoding', 0))
+        vendor_stats = [
+            results[f'{vendor}_stats'] for vendor in self._providers.keys()
+            if f'{vendor}_stats' in results
+        ]
+        total_stats['total_gpu_usage'] = max((s.get('gpu_usage', 0) for s in vendor_stats), default=0.0)
+        total_stats['total_encoding'] = max((s.get('encoding', 0) for s in vendor_stats), default=0.0)
+        total_stats['total_decoding'] = max((s.get('decoding', 0) for s in vendor_stats), default=0.0)
         
         # Update cache with lock
         with self._cache_lock:
@@ -1,36 +1,149 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 # AMD GPU statistics
 
-"""AMD GPU statistics provider using rocm-smi and radeontop."""
+"""AMD GPU statistics provider using AMD SMI (amdsmi), sysfs, rocm-smi or radeontop."""
 
 from __future__ import annotations
 
-from typing import Dict, Any
+import atexit
+import csv
+import json
+import os
+import re
+import subprocess
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
 
 from .base import GPUProvider
-from ...ps_commands import run_host_command
+from ...ps_commands import host_command_exists, is_flatpak, run_host_command
+
+try:
+    import amdsmi
+except (ImportError, OSError):  # Optional: fall back to running rocm-smi
+    amdsmi = None
+
+# amdgpu exposes the graphics busy percentage of each card in sysfs
+_DRM_CLASS_PATH = '/sys/class/drm'
+_GPU_BUSY_FILE = 'device/gpu_busy_percent'
+
+# Commands run on every poll; a single JSON query serves both processes
+# and totals, the CSV ones are for rocm-smi versions without --json
+_ROCM_POLL_CMD = ('rocm-smi', '--showuse', '--showpids', '--json')
+_ROCM_PROCESSES_CMD = ('rocm-smi', '--showpid', '--showuse', '--csv')
+_ROCM_USAGE_CSV_CMD = ('rocm-smi', '--showuse', '--csv')
+
+# A rocm-smi result this recent (seconds) is reused rather than queried again
+_ROCM_POLL_REUSE = 1.0
+
+# radeontop is kept running, dumping one line per second to stdout
+_RADEONTOP_STREAM_CMD = ('radeontop', '-d', '-', '-i', '1')
+
+# Graphics pipe usage in a radeontop dump line ("..., gpu 12.50%, ...")
+_RADEONTOP_GPU_RE = re.compile(r'\bgpu (\d+(?:\.\d+)?)%')
+
+# radeontop samples older than this (seconds) are considered stale
+_SAMPLE_MAX_AGE = 10.0
+
+# Minimum time between radeontop (re)starts, in seconds
+_STREAM_RESTART_DELAY = 10.0
 
 
 class AMDProvider(GPUProvider):
-    """AMD GPU statistics using rocm-smi and radeontop."""
+    """AMD GPU statistics using AMD SMI, or sysfs, rocm-smi and radeontop."""
+    
+    def __init__(self) -> None:
+        # AMD SMI processor handles (enumerated once), or None to use the tools
+        self._amdsmi_handles: Optional[List[Any]] = self._init_amdsmi()
+        # Cumulative graphics engine time (ns) and when it was read, per PID
+        self._gfx_time_prev: Dict[int, Tuple[int, float]] = {}
+        use_tools = self._amdsmi_handles is None
+        # gpu_busy_percent files, kept open for the provider's lifetime
+        # (close() may run while a poll is reading them) and re-read from
+        # offset 0
+        self._busy_fds: List[int] = self._open_busy_files() if use_tools else []
+        # rocm-smi and radeontop are often not installed; look them up once
+        # instead of trying (and failing) to run them on every poll.
+        # radeontop only provides totals, which sysfs covers if present.
+        self._has_rocm_smi = use_tools and host_command_exists('rocm-smi')
+        self._has_radeontop = (
+            use_tools and not self._busy_fds and host_command_exists('radeontop')
+        )
+        # Cleared if this rocm-smi turns out not to support --json
+        self._rocm_smi_json = True
+        # Last rocm-smi JSON result, shared by get_processes and get_total_stats
+        self._rocm_data: Optional[Dict[str, Any]] = None
+        self._rocm_data_time: float = 0.0
+        self._rocm_lock = threading.Lock()
+        
+        # Latest GPU usage from the radeontop stream
+        self._radeontop_usage: Optional[float] = None
+        self._radeontop_time: float = 0.0
+        self._stream: Optional[subprocess.Popen] = None
+        self._stream_started: float = -_STREAM_RESTART_DELAY
+        self._stream_lock = threading.Lock()
     
     @property
     def vendor_name(self) -> str:
         return 'amd'
     
+    @staticmethod
+    def _init_amdsmi() -> Optional[List[Any]]:
+        """Initialize AMD SMI and get the GPU handles."""
+        if amdsmi is None:
+            return None
+        try:
+            amdsmi.amdsmi_init()
+        except amdsmi.AmdSmiException:
+            return None
+        # AMD SMI stays initialized for the life of the app
+        atexit.register(amdsmi.amdsmi_shut_down)
+        try:
+            return amdsmi.amdsmi_get_processor_handles() or None
+        except amdsmi.AmdSmiException:
+            return None
+    
+    @staticmethod
+    def _open_busy_files() -> List[int]:
+        """Open the gpu_busy_percent file of every amdgpu card."""
+        fds: List[int] = []
+        try:
+            entries = sorted(os.scandir(_DRM_CLASS_PATH), key=lambda e: e.name)
+        except OSError:
+            return fds
+        
+        for entry in entries:
+            # card0, card1, ... (not connectors such as card0-DP-1)
+            if not (entry.name.startswith('card') and entry.name[4:].isdigit()):
+                continue
+            try:
+                fds.append(os.open(os.path.join(entry.path, _GPU_BUSY_FILE), os.O_RDONLY))
+            except OSError:
+                continue  # Not an amdgpu card
+        return fds
+    
     def get_processes(self) -> Dict[int, Dict[str, Any]]:
         """Get AMD GPU process information."""
+        if self._amdsmi_handles is not None:
+            return self._get_processes_amdsmi()
+        
         processes: Dict[int, Dict[str, Any]] = {}
+        if not self._has_rocm_smi:
+            return processes
+        
+        if self._rocm_smi_json:
+            data = self._rocm_poll()
+            if data is not None:
+                self._parse_rocm_smi_pids(data, processes)
+                return processes
         
         try:
             # Try rocm-smi first (better for per-process info)
-            cmd = ['rocm-smi', '--showpid', '--showuse', '--csv']
-            output = run_host_command(cmd)
+            output = run_host_command(_ROCM_PROCESSES_CMD)
             
-            for line in output.strip().split('\n'):
-                if not line.strip() or 'GPU' in line or 'PID' in line:
+            for parts in csv.reader(output.splitlines(), skipinitialspace=True):
+                if not parts or any('GPU' in field or 'PID' in field for field in parts):
                     continue
-                parts = [p.strip() for p in line.split(',')]
                 if len(parts) >= 3:
                     try:
                         pid = int(parts[0])
@@ -44,8 +157,48 @@ class AMDProvider(GPUProvider):
                             }
                     except (ValueError, IndexError):
                         continue
-        except Exception:
-            pass
+        except (OSError, csv.Error):
+            pass  # rocm-smi missing or unreadable output
+        
+        return processes
+    
+    def _get_processes_amdsmi(self) -> Dict[int, Dict[str, Any]]:
+        """Get AMD GPU process information through AMD SMI."""
+        processes: Dict[int, Dict[str, Any]] = {}
+        gfx_time: Dict[int, int] = {}
+        now = time.monotonic()
+        
+        for handle in self._amdsmi_handles:
+            try:
+                process_list = amdsmi.amdsmi_get_gpu_process_list(handle)
+            except amdsmi.AmdSmiException:
+                continue
+            
+            for entry in process_list:
+                if not isinstance(entry, dict) or not entry.get('pid'):
+                    continue
+                pid = entry['pid']
+                info = processes.setdefault(pid, {
+                    'gpu_usage': 0.0,
+                    'gpu_memory': 0,
+                    'encoding': 0.0,
+                    'decoding': 0.0
+                })
+                mem = entry.get('mem')
+                if isinstance(mem, int):
+                    info['gpu_memory'] += mem
+                engine_usage = entry.get('engine_usage')
+                if isinstance(engine_usage, dict) and isinstance(engine_usage.get('gfx'), int):
+                    gfx_time[pid] = gfx_time.get(pid, 0) + engine_usage['gfx']
+        
+        # Engine usage is cumulative busy time, so utilization is its rate
+        # of change since the previous poll
+        for pid, busy_ns in gfx_time.items():
+            prev = self._gfx_time_prev.get(pid)
+            if prev is not None and now > prev[1]:
+                usage = (busy_ns - prev[0]) / ((now - prev[1]) * 1e9) * 100
+                processes[pid]['gpu_usage'] = min(100.0, max(0.0, usage))
+        self._gfx_time_prev = {pid: (busy_ns, now) for pid, busy_ns in gfx_time.items()}
         
         return processes
     
@@ -53,25 +206,64 @@ class AMDProvider(GPUProvider):
         """Get total AMD GPU statistics."""
         stats = {'gpu_usage': 0.0, 'encoding': 0.0, 'decoding': 0.0}
         
-        # Try rocm-smi first
-        if self._try_rocm_smi(stats):
+        if self._amdsmi_handles is not None:
+            for handle in self._amdsmi_handles:
+                try:
+                    gfx_activity = amdsmi.amdsmi_get_gpu_activity(handle).get('gfx_activity')
+                except amdsmi.AmdSmiException:
+                    continue
+                if isinstance(gfx_activity, (int, float)):
+                    stats['gpu_usage'] = max(stats['gpu_usage'], float(gfx_activity))
+            return stats
+        
+        # sysfs is the cheapest source, then rocm-smi
+        if self._busy_fds and self._try_sysfs(stats):
+            return stats
+        
+        if self._has_rocm_smi and self._try_rocm_smi(stats):
             return stats
         
         # Fallback to radeontop
-        self._try_radeontop(stats)
+        if self._has_radeontop:
+            self._try_radeontop(stats)
         
         return stats
     
+    def close(self) -> None:
+        """Stop the radeontop stream."""
+        with self._stream_lock:
+            stream = self._stream
+            self._stream = None
+        if stream is not None and stream.poll() is None:
+            stream.terminate()
+    
+    def _try_sysfs(self, stats: Dict[str, float]) -> bool:
+        """Try to get stats from the amdgpu gpu_busy_percent files."""
+        found = False
+        for fd in self._busy_fds:
+            try:
+                gpu_usage = float(os.pread(fd, 16, 0))
+            except (OSError, ValueError):
+                continue
+            stats['gpu_usage'] = max(stats['gpu_usage'], gpu_usage)
+            found = True
+        return found
+    
     def _try_rocm_smi(self, stats: Dict[str, float]) -> bool:
         """Try to get stats from rocm-smi."""
+        if self._rocm_smi_json:
+            data = self._rocm_poll()
+            if data is not None:
+                return self._parse_rocm_smi_json(data, stats)
+            if self._rocm_smi_json:
+                return False  # Failed this time, but JSON is supported
+        
         try:
-            cmd = ['rocm-smi', '--showuse', '--csv']
-            output = run_host_command(cmd)
+            output = run_host_command(_ROCM_USAGE_CSV_CMD)
             
-            for line in output.strip().split('\n'):
-                if not line.strip() or 'GPU' in line:
+            for parts in csv.reader(output.splitlines(), skipinitialspace=True):
+                if not parts or any('GPU' in field for field in parts):
                     continue
-                parts = [p.strip() for p in line.split(',')]
                 if len(parts) >= 2:
                     try:
                         gpu_usage = float(parts[1].rstrip('%')) if '%' in parts[1] else 0.0
@@ -79,28 +271,143 @@ class AMDProvider(GPUProvider):
                         return True
                     except (ValueError, IndexError):
                         continue
-        except Exception:
-            pass
+        except (OSError, csv.Error):
+            pass  # rocm-smi missing or unreadable output
         
         return False
     
+    def _rocm_poll(self) -> Optional[Dict[str, Any]]:
+        """Run the combined rocm-smi JSON query, or reuse a recent result.
+        
+        get_processes and get_total_stats are called concurrently on each
+        update; whichever comes second waits for and reuses the first's
+        result instead of running rocm-smi again.
+        
+        Returns:
+            The decoded output, or None on failure. If the output is not
+            JSON, _rocm_smi_json is cleared so callers switch to CSV.
+        """
+        with self._rocm_lock:
+            if (self._rocm_data is not None
+                    and time.monotonic() - self._rocm_data_time < _ROCM_POLL_REUSE):
+                return self._rocm_data
+            
+            try:
+                output = run_host_command(_ROCM_POLL_CMD)
+            except OSError:
+                return None
+            if not output:
+                return None  # Timed out
+            try:
+                data = json.loads(output)
+            except json.JSONDecodeError:
+                # Older rocm-smi without --json; use CSV from now on
+                self._rocm_smi_json = False
+                return None
+            if not isinstance(data, dict):
+                return None
+            
+            self._rocm_data = data
+            self._rocm_data_time = time.monotonic()
+            return data
+    
+    @staticmethod
+    def _parse_rocm_smi_pids(data: Dict[str, Any], processes: Dict[int, Dict[str, Any]]) -> None:
+        """Get processes from rocm-smi JSON output.
+        
+        Each process is listed under "system" as
+        "PID1234": "name, gpu count, vram bytes, sdma usage, cu occupancy".
+        """
+        system = data.get('system')
+        if not isinstance(system, dict):
+            return
+        
+        for key, value in system.items():
+            if not key.startswith('PID') or not isinstance(value, str):
+                continue
+            try:
+                pid = int(key[3:])
+            except ValueError:
+                continue
+            fields = [field.strip() for field in value.split(',')]
+            vram = int(fields[2]) if len(fields) > 2 and fields[2].isdigit() else 0
+            if pid > 0:
+                processes[pid] = {
+                    'gpu_usage': 0.0,
+                    'gpu_memory': vram,
+                    'encoding': 0.0,
+                    'decoding': 0.0
+                }
+    
+    @staticmethod
+    def _parse_rocm_smi_json(data: Any, stats: Dict[str, float]) -> bool:
+        """Get stats from rocm-smi JSON output ({"card0": {"GPU use (%)": "12"}, ...})."""
+        if not isinstance(data, dict):
+            return False
+        
+        found = False
+        for card in data.values():
+            if not isinstance(card, dict) or 'GPU use (%)' not in card:
+                continue
+            try:
+                gpu_usage = float(card['GPU use (%)'])
+            except (ValueError, TypeError):
+                continue
+            stats['gpu_usage'] = max(stats['gpu_usage'], gpu_usage)
+            found = True
+        return found
+    
     def _try_radeontop(self, stats: Dict[str, float]) -> None:
-        """Try to get stats from radeontop."""
-        try:
-            cmd = ['timeout', '2', 'radeontop', '-l', '1', '-d', '-']
-            output = run_host_command(cmd)
+        """Try to get stats from the radeontop stream."""
+        self._ensure_stream()
+        
+        usage = self._radeontop_usage
+        if usage is not None and (time.time() - self._radeontop_time) < _SAMPLE_MAX_AGE:
+            stats['gpu_usage'] = max(stats['gpu_usage'], usage)
+    
+    def _ensure_stream(self) -> None:
+        """Start radeontop in dump mode if it is not running."""
+        with self._stream_lock:
+            if self._stream is not None and self._stream.poll() is None:
+                return
             
-            for line in output.split('\n'):
-                line_lower = line.lower()
-                if ('gpu' in line_lower or 'vram' in line_lower) and '%' in line:
-                    try:
-                        parts = line.split()
-                        for part in parts:
-                            if '%' in part:
-                                usage = float(part.rstrip('%'))
-                                stats['gpu_usage'] = max(stats['gpu_usage'], usage)
-                                break
-                    except (ValueError, IndexError):
-                        continue
-        except Exception:
-            pass
+            # Don't respawn in a tight loop if radeontop keeps failing
+            now = time.monotonic()
+            if now - self._stream_started < _STREAM_RESTART_DELAY:
+                return
+            self._stream_started = now
+            
+            cmd = list(_RADEONTOP_STREAM_CMD)
+            if is_flatpak():
+                cmd = ['flatpak-spawn', '--host'] + cmd
+            try:
+                self._stream = subprocess.Popen(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True
+                )
+            except OSError:
+                self._stream = None
+                return
+            
+            threading.Thread(
+                target=self._read_stream,
+                args=(self._stream,),
+                daemon=True,
+                name="RadeontopReader"
+            ).start()
+    
+    def _read_stream(self, stream: subprocess.Popen) -> None:
+        """Read samples from the radeontop dump (runs in a background thread).
+        
+        Each line is one sample, e.g.
+        "1700000000.000000: bus 03, gpu 12.50%, ee 0.00%, ..., vram 5.23% 200.12mb, ...".
+        """
+        for line in stream.stdout:
+            if stream is not self._stream:
+                return  # Closed
+            match = _RADEONTOP_GPU_RE.search(line)
+            if match:
+                self._radeontop_usage = float(match.group(1))
+                self._radeontop_time = time.time()
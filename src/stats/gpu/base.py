@@ -42,3 +42,10 @@ class GPUProvider(ABC):
     def vendor_name(self) -> str:
         """Return the vendor name (e.g., 'nvidia', 'intel', 'amd')."""
         pass
+    
+    def close(self) -> None:
+        """Release resources held by the provider, such as helper processes.
+        
+        The provider may be used again afterwards and will reacquire them.
+        """
+        pass
@@ -5,135 +5,232 @@
 
 from __future__ import annotations
 
+import json
 import os
 import subprocess
-from typing import List
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Set, Tuple
 
-from ...ps_commands import run_host_command
+from ...ps_commands import is_flatpak
+
+
+# PCI devices in sysfs, and the class prefix of display controllers
+_PCI_DEVICES_PATH = '/sys/bus/pci/devices'
+_DISPLAY_CLASS_PREFIX = '0x03'
+
+# PCI vendor IDs per GPU vendor
+_NVIDIA_VENDOR_IDS = {'0x10de'}
+_INTEL_VENDOR_IDS = {'0x8086'}
+_AMD_VENDOR_IDS = {'0x1002', '0x1022'}
+
+# Overall time limit for the vendor probes, in seconds
+_DETECT_TIMEOUT = 5.0
+
+# Loaded when the NVIDIA driver is; part of the hardware fingerprint so
+# that installing the driver invalidates a cached "no nvidia-smi" result
+_NVIDIA_MODULE_PATH = '/sys/module/nvidia'
+
+# Exit status of a probe command that is not installed
+_PROBE_NOT_FOUND = 127
+
+# Set to skip GPU detection (and monitoring) entirely
+_SKIP_DETECT_ENV = 'PM_SKIP_GPU_DETECT'
+
+# Detection result, computed once per process (GPUs do not come and go)
+_detected_gpus: Optional[List[str]] = None
+_detect_lock = threading.Lock()
 
 
 def detect_gpus() -> List[str]:
     """Detect available GPU types.
     
+    Detection probes vendor tools and can take seconds, so the result is
+    cached for the lifetime of the process, and on disk for as long as the
+    installed display hardware stays the same.
+    
     Returns:
         List of detected GPU vendor names: 'nvidia', 'intel', 'amd'
     """
-    gpu_types: List[str] = []
-    
-    # Check for NVIDIA GPU
-    if _detect_nvidia():
-        gpu_types.append('nvidia')
+    global _detected_gpus
+    with _detect_lock:
+        if _detected_gpus is None:
+            if os.environ.get(_SKIP_DETECT_ENV):
+                _detected_gpus = []
+            else:
+                _detected_gpus = _detect_gpus_cached()
+        return list(_detected_gpus)
+
+
+def _cache_file() -> str:
+    """Get the path of the on-disk detection cache."""
+    cache_dir = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(cache_dir, 'process-manager', 'gpu_types.json')
+
+
+def _detect_gpus_cached() -> List[str]:
+    """Detect GPUs, reusing the last result if the hardware is unchanged."""
+    devices = _scan_display_devices()
+    if not devices:
+        # sysfs not readable: nothing to key a cached result on
+        return _detect_gpus_uncached(devices)[0]
     
-    # Check for Intel GPU
-    if _detect_intel():
-        gpu_types.append('intel')
+    fingerprint = ' '.join(sorted(devices))
+    if os.path.isdir(_NVIDIA_MODULE_PATH):
+        fingerprint += ' nvidia-driver'
     
-    # Check for AMD GPU
-    if _detect_amd():
-        gpu_types.append('amd')
+    path = _cache_file()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if isinstance(cached, dict) and cached.get('fingerprint') == fingerprint:
+            gpu_types = cached.get('gpu_types')
+            if isinstance(gpu_types, list):
+                return [str(name) for name in gpu_types]
+    except (json.JSONDecodeError, OSError):
+        pass
     
+    gpu_types, conclusive = _detect_gpus_uncached(devices)
+    if not conclusive:
+        return gpu_types  # A probe timed out or failed; try again next time
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'fingerprint': fingerprint, 'gpu_types': gpu_types}, f)
+    except OSError:
+        pass  # Detect again next time
     return gpu_types
 
 
-def _detect_nvidia() -> bool:
-    """Detect NVIDIA GPU presence."""
+def _detect_gpus_uncached(devices: Set[str]) -> Tuple[List[str], bool]:
+    """Probe for each GPU vendor.
+    
+    The probes are independent and mostly wait on subprocesses, so they
+    run in parallel; a probe that has not finished by the deadline
+    counts as not detected.
+    
+    Args:
+        devices: Display controllers from _scan_display_devices().
+    
+    Returns:
+        The detected GPU vendor names, and whether every probe gave a
+        definite answer (False if any timed out or failed).
+    """
+    gpu_types: List[str] = []
+    conclusive = True
+    vendors = {device.split(':')[0] for device in devices}
+    probes = (
+        ('nvidia', _detect_nvidia),
+        ('intel', _detect_intel),
+        ('amd', _detect_amd),
+    )
+    
+    executor = ThreadPoolExecutor(max_workers=len(probes))
     try:
-        cmd = ['nvidia-smi', '--query-gpu=name', '--format=csv,noheader']
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=2
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            return True
-        
-        # Try via flatpak-spawn if direct call failed
-        result = run_host_command(cmd)
-        if result.strip():
-            return True
-    except (FileNotFoundError, subprocess.TimeoutExpired, OSError):
-        try:
-            result = run_host_command(['nvidia-smi', '--query-gpu=name', '--format=csv,noheader'])
-            if result.strip():
-                return True
-        except Exception:
-            pass
+        futures = [(name, executor.submit(probe, vendors)) for name, probe in probes]
+        deadline = time.monotonic() + _DETECT_TIMEOUT
+        for name, future in futures:
+            try:
+                found = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except Exception:
+                found = None  # Timed out or failed
+            if found:
+                gpu_types.append(name)
+            elif found is None:
+                conclusive = False  # Treated as not present, for now
+    finally:
+        executor.shutdown(wait=False)
     
-    return False
+    return gpu_types, conclusive
 
 
-def _detect_intel() -> bool:
-    """Detect Intel GPU presence."""
-    # First, check /sys/class/drm for Intel vendor ID (most reliable method)
-    for i in range(10):
-        vendor_path = f'/sys/class/drm/card{i}/device/vendor'
-        if os.path.exists(vendor_path):
-            try:
-                with open(vendor_path, 'r') as f:
-                    vendor_id = f.read().strip()
-                    if vendor_id == '0x8086':
-                        return True
-            except (OSError, IOError):
-                pass
-    
-    # Fallback: try intel_gpu_top command
+def _scan_display_devices() -> Set[str]:
+    """Get the PCI vendor and device IDs of all display controllers.
+    
+    Returns:
+        Set of 'vendor:device' IDs as found in sysfs (e.g. '0x10de:0x2684').
+        Empty if sysfs could not be read, in which case vendor tools have
+        to be probed.
+    """
+    found: Set[str] = set()
     try:
-        result = subprocess.run(
-            ['intel_gpu_top', '-l'],
-            capture_output=True,
-            text=True,
-            timeout=2
-        )
-        if result.returncode == 0:
-            return True
-    except (FileNotFoundError, subprocess.TimeoutExpired, OSError):
+        devices = os.listdir(_PCI_DEVICES_PATH)
+    except OSError:
+        return found
+    
+    for device in devices:
+        device_path = os.path.join(_PCI_DEVICES_PATH, device)
         try:
-            result = run_host_command(['intel_gpu_top', '-l'])
-            if result is not None:
-                # Re-check vendor ID to confirm
-                for i in range(10):
-                    vendor_path = f'/sys/class/drm/card{i}/device/vendor'
-                    if os.path.exists(vendor_path):
-                        try:
-                            with open(vendor_path, 'r') as f:
-                                vendor_id = f.read().strip()
-                                if vendor_id == '0x8086':
-                                    return True
-                        except (OSError, IOError):
-                            pass
-        except Exception:
-            pass
-    
-    return False
-
-
-def _detect_amd() -> bool:
-    """Detect AMD GPU presence."""
-    # Check /sys/class/drm for AMD vendor ID
-    for i in range(10):
-        vendor_path = f'/sys/class/drm/card{i}/device/vendor'
-        if os.path.exists(vendor_path):
-            try:
-                with open(vendor_path, 'r') as f:
-                    vendor_id = f.read().strip()
-                    # AMD vendor IDs: 0x1002 (AMD), 0x1022 (AMD/ATI)
-                    if vendor_id in ['0x1002', '0x1022']:
-                        return True
-            except (OSError, IOError):
-                pass
-    
-    # Fallback: try radeontop command
+            with open(os.path.join(device_path, 'class'), 'r') as f:
+                if not f.read().startswith(_DISPLAY_CLASS_PREFIX):
+                    continue
+            with open(os.path.join(device_path, 'vendor'), 'r') as f:
+                vendor = f.read().strip()
+            with open(os.path.join(device_path, 'device'), 'r') as f:
+                found.add(f'{vendor}:{f.read().strip()}')
+        except (OSError, IOError):
+            continue
+    
+    return found
+
+
+def _run_probe(cmd: List[str]) -> Optional[subprocess.CompletedProcess]:
+    """Run a detection command once, on the host when inside Flatpak.
+    
+    Returns:
+        The completed process (exit status _PROBE_NOT_FOUND if the command
+        is missing), or None if it timed out or could not be run.
+    """
+    if is_flatpak():
+        cmd = ['flatpak-spawn', '--host'] + cmd
     try:
-        result = subprocess.run(
-            ['radeontop', '-l', '1', '-d', '-'],
-            capture_output=True,
-            text=True,
-            timeout=2
-        )
-        if result.returncode == 0:
-            return True
-    except (FileNotFoundError, subprocess.TimeoutExpired, OSError):
-        pass
+        return subprocess.run(cmd, capture_output=True, text=True, timeout=2)
+    except FileNotFoundError:
+        return subprocess.CompletedProcess(cmd, _PROBE_NOT_FOUND, '', '')
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+
+
+def _probe_found(result: Optional[subprocess.CompletedProcess]) -> Optional[bool]:
+    """Interpret a probe result.
+    
+    Returns:
+        True if the command succeeded, False if it is not installed, or
+        None if the answer is unknown (timed out or failed).
+    """
+    if result is None:
+        return None
+    if result.returncode == 0:
+        return True
+    if result.returncode == _PROBE_NOT_FOUND:
+        return False
+    return None
+
+
+def _detect_nvidia(vendors: Set[str]) -> Optional[bool]:
+    """Detect NVIDIA GPU presence and a working nvidia-smi (None if unknown)."""
+    if vendors and not vendors & _NVIDIA_VENDOR_IDS:
+        return False
+    
+    result = _run_probe(['nvidia-smi', '--query-gpu=name', '--format=csv,noheader'])
+    found = _probe_found(result)
+    return found and bool(result.stdout.strip())
+
+
+def _detect_intel(vendors: Set[str]) -> Optional[bool]:
+    """Detect Intel GPU presence (None if unknown)."""
+    if vendors:
+        return bool(vendors & _INTEL_VENDOR_IDS)
+    
+    # sysfs not readable: try intel_gpu_top command
+    return _probe_found(_run_probe(['intel_gpu_top', '-l']))
+
+
+def _detect_amd(vendors: Set[str]) -> Optional[bool]:
+    """Detect AMD GPU presence (None if unknown)."""
+    if vendors:
+        return bool(vendors & _AMD_VENDOR_IDS)
     
-    return False
+    # sysfs not readable: try radeontop command
+    return _probe_found(_run_probe(['radeontop', '-l', '1', '-d', '-']))
@@ -6,20 +6,71 @@
 from __future__ import annotations
 
 import json
+import subprocess
+import threading
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 from .base import GPUProvider
-from ...ps_commands import run_host_command
+from ...ps_commands import host_command_exists, is_flatpak
+
+# intel_gpu_top sampling period, in milliseconds; doubled (up to the
+# maximum) after a run of idle samples, reset on activity
+_SAMPLE_PERIOD_MS = 1000
+_MAX_SAMPLE_PERIOD_MS = 4000
+_IDLE_SAMPLES_BEFORE_BACKOFF = 5
+_IDLE_BUSY_THRESHOLD = 1.0
+
+# Samples older than this (seconds) are considered stale
+_SAMPLE_MAX_AGE = 10.0
+
+# Minimum time between intel_gpu_top (re)starts, in seconds
+_STREAM_RESTART_DELAY = 10.0
+
+# Engine names used for render and video usage, in order of preference
+_RENDER_ENGINES = ('Render/3D', 'Render', 'RCS', 'render')
+_VIDEO_ENGINES = ('Video', 'VCS', 'video')
+
+
+def _engine_busy(engines: Dict[str, Any], names: Tuple[str, ...]) -> Optional[float]:
+    """Get the busy percentage of the first engine in names that is present.
+    
+    Returns:
+        The busy percentage, or None if no such engine has a valid value.
+    """
+    for name in names:
+        engine_data = engines.get(name)
+        if engine_data is None:
+            continue
+        if isinstance(engine_data, dict):
+            try:
+                return float(engine_data.get('busy', 0))
+            except (ValueError, TypeError):
+                pass
+        return None
+    return None
 
 
 class IntelProvider(GPUProvider):
-    """Intel GPU statistics using intel_gpu_top."""
+    """Intel GPU statistics using intel_gpu_top.
+    
+    intel_gpu_top is kept running in JSON streaming mode and read by a
+    background thread, instead of being spawned (and sampling for a full
+    period) on every poll.
+    """
     
     def __init__(self) -> None:
+        # Latest sample from the intel_gpu_top stream
         self._cache: Optional[Dict[str, Any]] = None
         self._cache_time: float = 0.0
-        self._cache_ttl: float = 1.8
+        self._lock = threading.Lock()
+        
+        self._has_intel_gpu_top = host_command_exists('intel_gpu_top')
+        self._stream: Optional[subprocess.Popen] = None
+        self._stream_started: float = -_STREAM_RESTART_DELAY
+        self._stream_lock = threading.Lock()
+        self._sample_period_ms = _SAMPLE_PERIOD_MS
+        self._idle_streak = 0
     
     @property
     def vendor_name(self) -> str:
@@ -53,29 +104,9 @@ class IntelProvider(GPUProvider):
                         
                         engine_classes = client_info.get('engine-classes', {})
                         if isinstance(engine_classes, dict):
-                            # Get Render/3D usage for GPU
-                            for engine_name in ['Render/3D', 'Render', 'RCS', 'render']:
-                                if engine_name in engine_classes:
-                                    engine_data = engine_classes[engine_name]
-                                    if isinstance(engine_data, dict):
-                                        busy = engine_data.get('busy', '0')
-                                        try:
-                                            gpu_usage = float(busy)
-                                        except (ValueError, TypeError):
-                                            pass
-                                    break
-                            
-                            # Get Video usage for encoding/decoding
-                            for engine_name in ['Video', 'VCS', 'video']:
-                                if engine_name in engine_classes:
-                                    engine_data = engine_classes[engine_name]
-                                    if isinstance(engine_data, dict):
-                                        busy = engine_data.get('busy', '0')
-                                        try:
-                                            video_usage = float(busy)
-                                        except (ValueError, TypeError):
-                                            pass
-                                    break
+                            # Render/3D usage for GPU, Video usage for encoding/decoding
+                            gpu_usage = _engine_busy(engine_classes, _RENDER_ENGINES) or 0.0
+                            video_usage = _engine_busy(engine_classes, _VIDEO_ENGINES) or 0.0
                         
                         processes[pid] = {
                             'gpu_usage': max(0.0, gpu_usage),
@@ -99,118 +130,161 @@ class IntelProvider(GPUProvider):
                 engines = data['engines']
                 if isinstance(engines, dict):
                     # Get Render/3D for GPU usage
-                    for engine_name in ['Render/3D', 'Render', 'RCS']:
-                        if engine_name in engines:
-                            engine_data = engines[engine_name]
-                            if isinstance(engine_data, dict):
-                                busy = engine_data.get('busy', 0)
-                                try:
-                                    stats['gpu_usage'] = float(busy)
-                                except (ValueError, TypeError):
-                                    pass
-                            break
+                    gpu_usage = _engine_busy(engines, _RENDER_ENGINES)
+                    if gpu_usage is not None:
+                        stats['gpu_usage'] = gpu_usage
                     
                     # Get Video for encoding/decoding
-                    for engine_name in ['Video', 'VCS']:
-                        if engine_name in engines:
-                            engine_data = engines[engine_name]
-                            if isinstance(engine_data, dict):
-                                busy = engine_data.get('busy', 0)
-                                try:
-                                    video_usage = float(busy)
-                                    stats['encoding'] = video_usage
-                                    stats['decoding'] = video_usage
-                                except (ValueError, TypeError):
-                                    pass
-                            break
+                    video_usage = _engine_busy(engines, _VIDEO_ENGINES)
+                    if video_usage is not None:
+                        stats['encoding'] = video_usage
+                        stats['decoding'] = video_usage
         except Exception:
             pass
         
         return stats
     
+    def close(self) -> None:
+        """Stop the intel_gpu_top stream."""
+        with self._stream_lock:
+            stream = self._stream
+            self._stream = None
+        if stream is not None and stream.poll() is None:
+            stream.terminate()
+    
     def _get_cached_data(self) -> Optional[Dict[str, Any]]:
-        """Get Intel GPU data with caching."""
-        now = time.time()
+        """Get the latest Intel GPU sample from the intel_gpu_top stream."""
+        self._ensure_stream()
         
-        if self._cache is not None and (now - self._cache_time) < self._cache_ttl:
-            return self._cache
+        with self._lock:
+            if self._cache is not None and (time.time() - self._cache_time) < _SAMPLE_MAX_AGE:
+                return self._cache
+        return None
+    
+    def _ensure_stream(self) -> None:
+        """Start intel_gpu_top in JSON streaming mode if it is not running."""
+        if not self._has_intel_gpu_top:
+            return
         
-        cmd = ['sudo', '-n', 'timeout', '1', 'intel_gpu_top', '-J', '-o', '-']
-        try:
-            output = run_host_command(cmd, timeout=3)
+        with self._stream_lock:
+            if self._stream is not None and self._stream.poll() is None:
+                return
             
-            if output and output.strip():
-                data = self._parse_json_output(output)
-                if data:
-                    self._cache = data
-                    self._cache_time = time.time()
-                    return data
-        except Exception:
-            pass
-        
-        return None
+            # Don't respawn in a tight loop if intel_gpu_top keeps failing
+            # (e.g. sudo needs a password)
+            now = time.monotonic()
+            if now - self._stream_started < _STREAM_RESTART_DELAY:
+                return
+            self._stream_started = now
+            
+            cmd = [
+                'sudo', '-n', 'intel_gpu_top', '-J',
+                '-s', str(self._sample_period_ms), '-o', '-'
+            ]
+            if is_flatpak():
+                cmd = ['flatpak-spawn', '--host'] + cmd
+            try:
+                self._stream = subprocess.Popen(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True
+                )
+            except OSError:
+                self._stream = None
+                return
+            
+            threading.Thread(
+                target=self._read_stream,
+                args=(self._stream,),
+                daemon=True,
+                name="IntelGPUTopReader"
+            ).start()
     
-    def _parse_json_output(self, output: str) -> Optional[Dict[str, Any]]:
-        """Parse intel_gpu_top JSON output, handling incomplete arrays."""
-        if not output or not output.strip():
-            return None
+    def _read_stream(self, stream: subprocess.Popen) -> None:
+        """Parse samples from the intel_gpu_top JSON stream (runs in a background thread).
         
-        output = output.strip()
+        intel_gpu_top writes one JSON array that never closes while it
+        runs, so each top-level object is cut out by brace matching and
+        parsed on its own as soon as it is complete.
+        """
+        chars: List[str] = []
+        depth = 0
+        in_string = False
+        escape_next = False
         
-        # Try to parse as complete JSON
+        for line in stream.stdout:
+            for char in line:
+                if depth == 0 and char != '{':
+                    continue  # '[' and ',' between samples
+                chars.append(char)
+                
+                if in_string:
+                    if escape_next:
+                        escape_next = False
+                    elif char == '\\':
+                        escape_next = True
+                    elif char == '"':
+                        in_string = False
+                elif char == '"':
+                    in_string = True
+                elif char == '{':
+                    depth += 1
+                elif char == '}':
+                    depth -= 1
+                    if depth == 0:
+                        if stream is not self._stream:
+                            return  # Replaced (sampling period changed) or closed
+                        self._store_sample(''.join(chars))
+                        chars.clear()
+    
+    def _store_sample(self, text: str) -> None:
+        """Parse one intel_gpu_top sample and make it the current data."""
         try:
-            data = json.loads(output)
-            if isinstance(data, list) and len(data) > 0:
-                return data[-1]
-            elif isinstance(data, dict):
-                return data
+            data = json.loads(text)
         except json.JSONDecodeError:
-            pass
+            return
+        if not isinstance(data, dict):
+            return
         
-        # Try to extract the last complete object
-        try:
-            last_complete_end = -1
-            brace_count = 0
-            in_string = False
-            escape_next = False
-            
-            for i, char in enumerate(output):
-                if escape_next:
-                    escape_next = False
-                    continue
-                if char == '\\':
-                    escape_next = True
-                    continue
-                if char == '"' and not escape_next:
-                    in_string = not in_string
-                    continue
-                if in_string:
-                    continue
-                    
-                if char == '{':
-                    brace_count += 1
-                elif char == '}':
-                    brace_count -= 1
-                    if brace_count == 0:
-                        last_complete_end = i
-            
-            if last_complete_end > 0:
-                obj_start = -1
-                brace_count = 0
-                for i in range(last_complete_end, -1, -1):
-                    char = output[i]
-                    if char == '}':
-                        brace_count += 1
-                    elif char == '{':
-                        brace_count -= 1
-                        if brace_count == 0:
-                            obj_start = i
-                            break
-                
-                if obj_start >= 0:
-                    obj_str = output[obj_start:last_complete_end + 1]
-                    return json.loads(obj_str)
-        except (json.JSONDecodeError, IndexError, ValueError):
-            pass
+        with self._lock:
+            self._cache = data
+            self._cache_time = time.time()
         
-        return None
+        busy = 0.0
+        engines = data.get('engines')
+        if isinstance(engines, dict):
+            busy = max(
+                _engine_busy(engines, _RENDER_ENGINES) or 0.0,
+                _engine_busy(engines, _VIDEO_ENGINES) or 0.0
+            )
+        self._adapt_sample_period(busy)
+    
+    def _adapt_sample_period(self, busy: float) -> None:
+        """Sample less often while the GPU is idle, at full rate once it is not.
+        
+        intel_gpu_top cannot change its period while running, so a new
+        period takes effect by restarting the stream.
+        """
+        if busy < _IDLE_BUSY_THRESHOLD:
+            self._idle_streak += 1
+            if (self._idle_streak < _IDLE_SAMPLES_BEFORE_BACKOFF
+                    or self._sample_period_ms >= _MAX_SAMPLE_PERIOD_MS):
+                return
+            period = min(_MAX_SAMPLE_PERIOD_MS, self._sample_period_ms * 2)
+        else:
+            self._idle_streak = 0
+            if self._sample_period_ms == _SAMPLE_PERIOD_MS:
+                return
+            period = _SAMPLE_PERIOD_MS
+        
+        self._idle_streak = 0
+        # Same state as _ensure_stream, which runs on the sampler thread
+        with self._stream_lock:
+            self._sample_period_ms = period
+            stream = self._stream
+            self._stream = None
+            # Restart on the next poll without waiting for the restart delay
+            self._stream_started = -_STREAM_RESTART_DELAY
+        if stream is not None and stream.poll() is None:
+            stream.terminate()
@@ -1,41 +1,127 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 # NVIDIA GPU statistics
 
-"""NVIDIA GPU statistics provider using nvidia-smi."""
+"""NVIDIA GPU statistics provider using NVML (pynvml) or nvidia-smi."""
 
 from __future__ import annotations
 
-from typing import Dict, Any
+import atexit
+import csv
+import subprocess
+from typing import Dict, Any, List, Optional, Sequence
 
 from .base import GPUProvider
-from ...ps_commands import run_host_command
+from ...ps_commands import is_flatpak, run_host_command
+
+try:
+    import pynvml
+except ImportError:  # Optional: fall back to running nvidia-smi
+    pynvml = None
+
+# nvidia-smi queries run on every poll
+_COMPUTE_APPS_QUERY = (
+    'nvidia-smi',
+    '--query-compute-apps=pid,used_memory',
+    '--format=csv,noheader,nounits'
+)
+_ENCODER_SESSIONS_QUERY = (
+    'nvidia-smi',
+    '--query-encoder-sessions=pid,codec_type,codec_name,session_id',
+    '--format=csv,noheader'
+)
+_UTILIZATION_QUERY = (
+    'nvidia-smi',
+    '--query-gpu=utilization.gpu,utilization.enc,utilization.dec',
+    '--format=csv,noheader,nounits'
+)
+
+
+def _start_query(cmd: Sequence[str]) -> subprocess.Popen:
+    """Start an nvidia-smi query on the host without waiting for it."""
+    if is_flatpak():
+        cmd = ['flatpak-spawn', '--host', *cmd]
+    return subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True
+    )
+
+
+def _read_query(proc: subprocess.Popen, timeout: int = 5) -> str:
+    """Wait for a query started with _start_query and return its stdout."""
+    try:
+        output, _ = proc.communicate(timeout=timeout)
+        return output
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.communicate()
+        return ""
+
+
+def _stop_query(proc: Optional[subprocess.Popen]) -> None:
+    """Kill and reap a query that was started but not read."""
+    if proc is not None and proc.returncode is None:
+        proc.kill()
+        proc.communicate()
 
 
 class NvidiaProvider(GPUProvider):
-    """NVIDIA GPU statistics using nvidia-smi."""
+    """NVIDIA GPU statistics using NVML, or nvidia-smi if NVML is unavailable."""
+    
+    def __init__(self) -> None:
+        # NVML device handles (enumerated once), or None to use nvidia-smi
+        self._nvml_handles: Optional[List[Any]] = self._init_nvml()
+        # Timestamp of the last process utilization sample seen, per device
+        self._nvml_last_seen: Dict[int, int] = {}
     
     @property
     def vendor_name(self) -> str:
         return 'nvidia'
     
+    @staticmethod
+    def _init_nvml() -> Optional[List[Any]]:
+        """Initialize NVML and get the device handles."""
+        if pynvml is None:
+            return None
+        try:
+            pynvml.nvmlInit()
+        except pynvml.NVMLError:
+            return None
+        # NVML stays initialized for the life of the app
+        atexit.register(pynvml.nvmlShutdown)
+        try:
+            return [
+                pynvml.nvmlDeviceGetHandleByIndex(i)
+                for i in range(pynvml.nvmlDeviceGetCount())
+            ]
+        except pynvml.NVMLError:
+            return None
+    
     def get_processes(self) -> Dict[int, Dict[str, Any]]:
         """Get NVIDIA GPU process information."""
+        if self._nvml_handles is not None:
+            return self._get_processes_nvml()
+        
         processes: Dict[int, Dict[str, Any]] = {}
         
         try:
-            # Get processes with memory usage
-            cmd = [
-                'nvidia-smi',
-                '--query-compute-apps=pid,used_memory,process_name',
-                '--format=csv,noheader,nounits'
-            ]
-            output = run_host_command(cmd)
+            # Start both queries before waiting on either, so they run concurrently
+            apps_query = _start_query(_COMPUTE_APPS_QUERY)
+            encoder_query = None
+            try:
+                encoder_query = _start_query(_ENCODER_SESSIONS_QUERY)
+                output = _read_query(apps_query)
+                encoder_output = _read_query(encoder_query)
+            finally:
+                # Don't leave a query running if the other one failed
+                _stop_query(apps_query)
+                _stop_query(encoder_query)
             
-            for line in output.strip().split('\n'):
-                if not line.strip():
+            for parts in csv.reader(output.splitlines(), skipinitialspace=True):
+                if not parts:
                     continue
-                parts = [p.strip() for p in line.split(',')]
-                if len(parts) >= 3:
+                if len(parts) >= 2:
                     try:
                         pid = int(parts[0])
                         memory_mb = int(parts[1]) if parts[1] else 0
@@ -48,84 +134,100 @@ class NvidiaProvider(GPUProvider):
                     except (ValueError, IndexError):
                         continue
             
-            # Get per-process GPU utilization
-            self._update_gpu_utilization(processes)
-            
             # Get encoding/decoding info
-            self._update_encoder_stats(processes)
+            self._update_encoder_stats(processes, encoder_output)
                 
         except Exception:
             pass
         
         return processes
     
-    def _update_gpu_utilization(self, processes: Dict[int, Dict[str, Any]]) -> None:
-        """Update GPU utilization for processes."""
-        try:
-            cmd = [
-                'nvidia-smi',
-                '--query-compute-apps=pid,sm,memory',
-                '--format=csv,noheader,nounits'
-            ]
-            output = run_host_command(cmd)
-            for line in output.strip().split('\n'):
-                if not line.strip():
+    def _update_encoder_stats(self, processes: Dict[int, Dict[str, Any]], output: str) -> None:
+        """Update encoding/decoding stats for processes from encoder session output."""
+        for parts in csv.reader(output.splitlines(), skipinitialspace=True):
+            if not parts:
+                continue
+            if len(parts) >= 3:
+                try:
+                    pid = int(parts[0])
+                    codec_type = parts[1].lower()
+                    if pid in processes:
+                        if 'encode' in codec_type or 'h264' in codec_type or 'hevc' in codec_type:
+                            processes[pid]['encoding'] = 30.0
+                        elif 'decode' in codec_type:
+                            processes[pid]['decoding'] = 30.0
+                except (ValueError, IndexError):
                     continue
-                parts = [p.strip() for p in line.split(',')]
-                if len(parts) >= 2:
-                    try:
-                        pid = int(parts[0])
-                        sm_usage = float(parts[1]) if parts[1] else 0.0
-                        if pid in processes:
-                            processes[pid]['gpu_usage'] = sm_usage
-                    except (ValueError, IndexError):
-                        continue
-        except Exception:
-            pass
     
-    def _update_encoder_stats(self, processes: Dict[int, Dict[str, Any]]) -> None:
-        """Update encoding/decoding stats for processes."""
-        try:
-            cmd = [
-                'nvidia-smi',
-                '--query-encoder-sessions=pid,codec_type,codec_name,session_id',
-                '--format=csv,noheader'
-            ]
-            output = run_host_command(cmd)
-            for line in output.strip().split('\n'):
-                if not line.strip():
-                    continue
-                parts = [p.strip() for p in line.split(',')]
-                if len(parts) >= 3:
-                    try:
-                        pid = int(parts[0])
-                        codec_type = parts[1].lower()
-                        if pid in processes:
-                            if 'encode' in codec_type or 'h264' in codec_type or 'hevc' in codec_type:
-                                processes[pid]['encoding'] = 30.0
-                            elif 'decode' in codec_type:
-                                processes[pid]['decoding'] = 30.0
-                    except (ValueError, IndexError):
-                        continue
-        except Exception:
-            pass
+    def _get_processes_nvml(self) -> Dict[int, Dict[str, Any]]:
+        """Get NVIDIA GPU process information through NVML."""
+        processes: Dict[int, Dict[str, Any]] = {}
+        
+        for index, handle in enumerate(self._nvml_handles):
+            try:
+                running = pynvml.nvmlDeviceGetComputeRunningProcesses(handle)
+            except pynvml.NVMLError:
+                continue
+            
+            for proc in running:
+                info = processes.setdefault(proc.pid, {
+                    'gpu_usage': 0.0,
+                    'gpu_memory': 0,
+                    'encoding': 0.0,
+                    'decoding': 0.0
+                })
+                info['gpu_memory'] += proc.usedGpuMemory or 0
+            
+            # Per-process utilization samples since the previous call
+            try:
+                samples = pynvml.nvmlDeviceGetProcessUtilization(
+                    handle, self._nvml_last_seen.get(index, 0)
+                )
+            except pynvml.NVMLError:
+                continue  # No new samples
+            
+            for sample in samples:
+                self._nvml_last_seen[index] = max(
+                    self._nvml_last_seen.get(index, 0), sample.timeStamp
+                )
+                info = processes.get(sample.pid)
+                if info is not None:
+                    info['gpu_usage'] = max(info['gpu_usage'], float(sample.smUtil))
+                    info['encoding'] = max(info['encoding'], float(sample.encUtil))
+                    info['decoding'] = max(info['decoding'], float(sample.decUtil))
+        
+        return processes
     
     def get_total_stats(self) -> Dict[str, float]:
         """Get total NVIDIA GPU statistics."""
         stats = {'gpu_usage': 0.0, 'encoding': 0.0, 'decoding': 0.0}
         
+        if self._nvml_handles is not None:
+            for handle in self._nvml_handles:
+                try:
+                    gpu_usage = pynvml.nvmlDeviceGetUtilizationRates(handle).gpu
+                except pynvml.NVMLError:
+                    continue
+                # GPUs without NVENC/NVDEC raise NotSupported for these
+                try:
+                    enc_usage, _ = pynvml.nvmlDeviceGetEncoderUtilization(handle)
+                except pynvml.NVMLError:
+                    enc_usage = 0
+                try:
+                    dec_usage, _ = pynvml.nvmlDeviceGetDecoderUtilization(handle)
+                except pynvml.NVMLError:
+                    dec_usage = 0
+                stats['gpu_usage'] = max(stats['gpu_usage'], float(gpu_usage))
+                stats['encoding'] = max(stats['encoding'], float(enc_usage))
+                stats['decoding'] = max(stats['decoding'], float(dec_usage))
+            return stats
+        
         try:
-            cmd = [
-                'nvidia-smi',
-                '--query-gpu=utilization.gpu,utilization.enc,utilization.dec',
-                '--format=csv,noheader,nounits'
-            ]
-            output = run_host_command(cmd)
+            output = run_host_command(_UTILIZATION_QUERY)
             
-            for line in output.strip().split('\n'):
-                if not line.strip():
+            for parts in csv.reader(output.splitlines(), skipinitialspace=True):
+                if not parts:
                     continue
-                parts = [p.strip() for p in line.split(',')]
                 if len(parts) >= 3:
                     try:
                         gpu_usage = float(parts[0]) if parts[0] else 0.0
@@ -98,15 +98,16 @@ class BookmarksPanelMixin:
         process_map = {p['pid']: p for p in all_processes}
         
         # Add bookmarked processes
+        live_pids = []
         for pid in bookmarked_pids:
             if pid in process_map:
-                proc = process_map[pid]
-                row = self.create_bookmark_row(proc)
+                live_pids.append(pid)
+                row = self.create_bookmark_row(process_map[pid])
                 self.bookmarks_list.append(row)
-            else:
-                # Process no longer exists, remove from bookmarks
-                bookmarked_pids.remove(pid)
-                self.settings.set("bookmarked_pids", bookmarked_pids)
+        
+        # Drop bookmarks for processes that no longer exist (one settings write)
+        if len(live_pids) != count:
+            self.settings.set("bookmarked_pids", live_pids)
     
     def create_bookmark_row(self, proc):
         """Create a row for a bookmarked process."""
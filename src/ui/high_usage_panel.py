@@ -5,10 +5,21 @@ import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 
+import heapq
 import os
+from typing import NamedTuple
 from gi.repository import Gtk, Pango
 
 
+class _ProcessSnapshot(NamedTuple):
+    """Per-PID stats remembered between refreshes for change detection."""
+    cpu: float
+    memory: float
+    name: str
+    ppid: int
+    uid: int
+
+
 class HighUsagePanelMixin:
     """Mixin class providing high usage panel functionality for ProcessManagerWindow.
     
@@ -18,7 +29,7 @@ class HighUsagePanelMixin:
     - all_user_button: Gtk.ToggleButton
     - tree_view: Gtk.TreeView
     - list_store: Gtk.ListStore
-    - _prev_process_stats: dict
+    - _prev_process_stats: dict mapping PID to _ProcessSnapshot
     """
     
     def create_high_usage_panel(self):
@@ -77,21 +88,10 @@ class HighUsagePanelMixin:
         # Process names to filter out (our own refresh processes)
         filtered_names = {'ps', 'flatpak-spawn'}
         
-        # Helper function to check if process should be filtered
-        def should_filter_process(proc_name):
-            """Check if process should be filtered from high usage panel."""
-            return proc_name in filtered_names
-        
-        # Helper function to check if process is a kernel thread
-        def is_kernel_thread(proc):
-            """Check if process is a kernel thread (PPID 2 is kthreadd or PID 2)."""
-            ppid = proc.get('ppid', 0)
-            pid = proc.get('pid', 0)
-            return ppid == 2 or pid == 2
-        
         # Get total memory for percentage calculation
         stats = self.system_stats.get_memory_info()
         mem_total = stats['mem_total']
+        mem_scale = (100.0 / mem_total) if mem_total > 0 else 0.0
         
         # Find processes with significant changes
         changed_cpu = []
@@ -104,36 +104,35 @@ class HighUsagePanelMixin:
         current_pids = set()
         for proc in processes:
             # Skip our own refresh processes
-            if should_filter_process(proc['name']):
+            if proc['name'] in filtered_names:
                 continue
             
-            # Skip kernel threads if not showing them
-            if not show_kernel_threads and is_kernel_thread(proc):
+            pid = proc['pid']
+            
+            # Skip kernel threads if not showing them (PPID 2 is kthreadd)
+            if not show_kernel_threads and (pid == 2 or proc.get('ppid', 0) == 2):
                 continue
             
             # Respect User/All filter
-            if my_processes:
-                proc_uid = proc.get('uid', -1)
-                if proc_uid != current_uid:
-                    continue
-            pid = proc['pid']
+            if my_processes and proc.get('uid', -1) != current_uid:
+                continue
             current_pids.add(pid)
             cpu_percent = proc['cpu']
-            mem_percent = (proc['memory'] / mem_total * 100) if mem_total > 0 else 0
+            mem_percent = proc['memory'] * mem_scale
             
-            current_stats[pid] = {
-                'cpu': cpu_percent,
-                'memory': mem_percent,
-                'name': proc['name'],
-                'ppid': proc.get('ppid', 0),
-                'uid': proc.get('uid', -1)
-            }
+            current_stats[pid] = _ProcessSnapshot(
+                cpu_percent,
+                mem_percent,
+                proc['name'],
+                proc.get('ppid', 0),
+                proc.get('uid', -1),
+            )
             
             # Check for changes if we have previous data
             if pid in self._prev_process_stats:
                 prev = self._prev_process_stats[pid]
-                cpu_change = cpu_percent - prev['cpu']
-                mem_change = mem_percent - prev['memory']
+                cpu_change = cpu_percent - prev.cpu
+                mem_change = mem_percent - prev.memory
                 
                 # Check CPU change (absolute change >= threshold)
                 if abs(cpu_change) >= cpu_change_threshold:
@@ -170,33 +169,33 @@ class HighUsagePanelMixin:
         for pid in ended_pids:
             prev_info = self._prev_process_stats[pid]
             # Skip our own refresh processes
-            if should_filter_process(prev_info['name']):
+            if prev_info.name in filtered_names:
                 continue
             
             # Skip kernel threads if not showing them
             if not show_kernel_threads:
-                prev_ppid = prev_info.get('ppid', 0)
+                prev_ppid = prev_info.ppid
                 if prev_ppid == 2 or pid == 2:
                     continue
             
             # Respect User/All filter
             if my_processes:
-                prev_uid = prev_info.get('uid', -1)
+                prev_uid = prev_info.uid
                 if prev_uid != current_uid:
                     continue
             
             ended_processes.append({
                 'pid': pid,
-                'name': prev_info['name'],
+                'name': prev_info.name,
                 'type': 'ended'
             })
         
         # Update previous stats cache
         self._prev_process_stats = current_stats
         
-        # Sort by absolute change descending
-        changed_cpu.sort(key=lambda x: abs(x['change']), reverse=True)
-        changed_mem.sort(key=lambda x: abs(x['change']), reverse=True)
+        # Keep only the top 5 by absolute change (descending); no full sort needed
+        changed_cpu = heapq.nlargest(5, changed_cpu, key=lambda x: abs(x['change']))
+        changed_mem = heapq.nlargest(5, changed_mem, key=lambda x: abs(x['change']))
         
         # Clear existing items
         while True:
@@ -828,32 +828,26 @@ class ProcessManagerWindow(
         # Get search text
         search_text = self.search_entry.get_text().lower()
         
-        def matches_search(proc):
-            """Check if process matches search text.
-            
-            Supports OR filtering with | separator.
-            Example: 'firefox|chrome' matches processes containing 'firefox' OR 'chrome'.
-            """
-            if not search_text:
-                return True
-            
-            # Support OR filtering with | separator
-            if '|' in search_text:
-                patterns = [p.strip() for p in search_text.split('|') if p.strip()]
-                if not patterns:
-                    return True
-                # Match if any pattern matches name or PID
+        # Split OR patterns once per refresh instead of once per process.
+        # Supports OR filtering with | separator.
+        # Example: 'firefox|chrome' matches processes containing 'firefox' OR 'chrome'.
+        if '|' in search_text:
+            search_patterns = [p.strip() for p in search_text.split('|') if p.strip()]
+        elif search_text:
+            search_patterns = [search_text]
+        else:
+            search_patterns = []
+        
+        # Filter by search (match any pattern against name or PID)
+        if search_patterns:
+            filtered_processes = []
+            for proc in processes:
                 proc_name_lower = proc['name'].lower()
                 proc_pid_str = str(proc['pid'])
-                return any(
-                    pattern in proc_name_lower or pattern in proc_pid_str
-                    for pattern in patterns
-                )
-            
-            return search_text in proc['name'].lower() or search_text in str(proc['pid'])
-        
-        # Filter by search
-        filtered_processes = [p for p in processes if matches_search(p)]
+                if any(pattern in proc_name_lower or pattern in proc_pid_str for pattern in search_patterns):
+                    filtered_processes.append(proc)
+        else:
+            filtered_processes = list(processes)
         
         # When searching, hide already selected items from results
         if search_text:
@@ -968,6 +962,28 @@ class ProcessManagerWindow(
         if self.process_history:
             self.process_history.update_processes(processes)
     
+    def update_process_rows(self, updates):
+        """Update cells of specific process rows in place, without a full refresh.
+        
+        Args:
+            updates: Iterable of (pid, fields) pairs. Supported field: 'nice'.
+        """
+        updates = dict(updates)
+        matches = []
+        
+        def collect(model, path, iter):
+            fields = updates.get(model.get_value(iter, 6))  # PID column
+            if fields:
+                matches.append((iter.copy(), fields))
+            return False  # Continue iterating
+        
+        self.list_store.foreach(collect)
+        
+        # Set values after iterating, since a sorted store may reorder rows
+        for iter, fields in matches:
+            if 'nice' in fields:
+                self.list_store.set_value(iter, 5, str(fields['nice']))  # Nice column
+    
     def format_memory(self, bytes_val):
         """Format memory in human-readable format."""
         return format_bytes(bytes_val)
@@ -1077,15 +1093,8 @@ class ProcessManagerWindow(
         if pid in self.selected_pids:
             process_info['user'] = self.selected_pids[pid].get('user', 'N/A')
         
-        # Get more details from the process list
-        all_processes = self.process_manager.get_processes(
-            show_all=True,
-            my_processes=False,
-            active_only=False,
-            show_kernel_threads=True
-        )
-        
-        for proc in all_processes:
+        # Get more details for this process only (no full process table scan)
+        for proc in self.process_manager.get_processes_by_pids([pid]):
             if proc['pid'] == pid:
                 process_info['user'] = proc.get('user', 'N/A')
                 process_info['nice'] = proc.get('nice', 'N/A')
@@ -1111,12 +1120,13 @@ class ProcessManagerWindow(
             iter = model.get_iter(path)
             pid = model.get_value(iter, pid_col)
             name = model.get_value(iter, 0)
-            # Get current nice value
-            nice_str = model.get_value(iter, 5)  # Nice column
-            try:
-                nice = int(nice_str)
-            except (ValueError, TypeError):
-                nice = 0
+            # Current nice value; only the processes tab has a Nice column
+            nice = None
+            if tree_view is self.tree_view:
+                try:
+                    nice = int(model.get_value(iter, 5))
+                except (ValueError, TypeError):
+                    pass
             processes.append({'pid': pid, 'name': name, 'nice': nice})
         
         dialog = ReniceDialog(self, self.process_manager, processes)